@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 from vector_db import initialize_vector_db_if_needed
+from prefetch import get_prefetcher
 
 st.set_page_config(page_title="AI Summarizer", layout="wide")
 st.title("📄 AI Meeting Summarizer")
@@ -47,6 +48,9 @@ meeting_files.sort(key=sort_by_date, reverse=True)
 st.subheader("Select a meeting to summarize:")
 st.divider()
 
+# Extractive digests computed at ingest time (no LLM calls)
+digests = vector_db.digests if vector_db else {}
+
 # Display buttons in a grid (3 per row)
 cols = st.columns(3)
 
@@ -55,5 +59,23 @@ for idx, meeting in enumerate(meeting_files):
     label = meeting.replace(".pdf", "")
     with col:
         if st.button(f"📅 {label}", key=meeting):
+            prefetcher = get_prefetcher()
+            # A speculative summary for a meeting opened earlier is no longer needed
+            if "speculative_meeting" in st.session_state:
+                prefetcher.discard_speculative(st.session_state.pop("speculative_meeting"))
             st.session_state["selected_meeting"] = meeting
+            # Warm the model and load the meeting while the Summarizer page opens
+            if prefetcher.prefetch(meeting, vector_db, transcript_dir):
+                st.session_state["speculative_meeting"] = meeting
             st.switch_page("pages/1_Summarizer.py")
+
+        digest = digests.get(meeting)
+        if digest:
+            if digest["keywords"]:
+                st.caption("🏷️ " + " · ".join(digest["keywords"]))
+            if digest["participants"]:
+                st.caption("👥 " + ", ".join(digest["participants"]) + " _(best-effort name detection)_")
+            if digest["preview"]:
+                with st.expander("Preview"):
+                    for sentence in digest["preview"]:
+                        st.markdown(f"- {sentence}")
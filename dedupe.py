@@ -0,0 +1,222 @@
+import base64
+import json
+import os
+import re
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Set
+
+# Mersenne prime keeps (a * x + b) inside int64 for 31-bit shingle hashes
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Signatures are < 2**31, so they fit int32 (persisted little-endian)
+_SIGNATURE_DTYPE = np.dtype("<i4")
+
+# Newly indexed band keys are merged into the sorted arrays in batches
+_PENDING_KEYS = 8192
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    """Hash the word k-shingles of a text into 31-bit integers"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < k:
+        shingles = [" ".join(words)] if words else [""]
+    else:
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) & _MERSENNE_PRIME for s in shingles),
+        dtype=np.int64,
+    )
+
+
+class MinHashDeduplicator:
+    """Near-duplicate chunk detection with MinHash signatures and LSH banding.
+
+    Canonical chunks keep their signature; duplicates are not stored again but
+    recorded as back-references ``{"filename", "chunk_index"}`` on the chunk
+    they duplicate. State is persisted as JSON next to the vector database.
+
+    Signatures are rows of one int32 matrix and band keys are 64-bit ints in
+    sorted arrays, about 1 KB per chunk, so very long transcripts don't blow
+    up memory (the state still grows linearly with the corpus).
+    """
+
+    def __init__(self, state_path: str = "./chroma_db/dedupe_state.json",
+                 num_perm: int = 128, bands: int = 32, threshold: float = 0.8,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.state_path = state_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        # Per-band multipliers that fold a band's rows into one 64-bit key
+        self._band_weights = rng.integers(1, 1 << 63, size=(bands, self.rows_per_band), dtype=np.uint64)
+
+        self.references: Dict[str, List[Dict]] = {}
+        self.meetings: Dict[str, Dict] = {}
+
+        # Signature matrix; rows of removed chunks stay until the next load
+        self._matrix = np.empty((0, num_perm), dtype=_SIGNATURE_DTYPE)
+        self._ids: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        # LSH buckets: sorted band keys with their rows, plus recent inserts
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._key_rows = np.empty(0, dtype=np.int32)
+        self._pending: Dict[int, List[int]] = {}
+
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                self.merge_state(json.load(f))
+
+    def merge_state(self, state: Dict) -> None:
+        """Add persisted state (e.g. from a snapshot) to this one.
+
+        Signatures and references are combined; a meeting present in both
+        takes the incoming accounting.
+        """
+        for chunk_id, refs in state["references"].items():
+            for ref in refs:
+                self.add_reference(chunk_id, ref["filename"], ref["chunk_index"])
+        self.meetings.update(state["meetings"])
+        for chunk_id, signature in state["signatures"].items():
+            if isinstance(signature, str):
+                signature = np.frombuffer(base64.b64decode(signature), dtype=_SIGNATURE_DTYPE)
+            self.add_canonical(chunk_id, np.asarray(signature))
+
+    def save(self) -> None:
+        state = {
+            "signatures": {
+                chunk_id: base64.b64encode(self._matrix[row].tobytes()).decode("ascii")
+                for chunk_id, row in self._row_of.items()
+            },
+            "references": self.references,
+            "meetings": self.meetings,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text, vectorized over all permutations"""
+        hashes = shingle_hashes(text)
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> np.ndarray:
+        bands = np.asarray(signature).astype(np.uint64).reshape(self.bands, self.rows_per_band)
+        return (bands * self._band_weights).sum(axis=1)
+
+    def _merge_pending(self) -> None:
+        """Fold recently inserted band keys into the sorted arrays"""
+        keys = np.fromiter((key for key, rows in self._pending.items() for _ in rows), dtype=np.uint64)
+        rows = np.fromiter((row for rows in self._pending.values() for row in rows), dtype=np.int32)
+        order = np.argsort(keys, kind="stable")
+        positions = np.searchsorted(self._keys, keys[order])
+        self._keys = np.insert(self._keys, positions, keys[order])
+        self._key_rows = np.insert(self._key_rows, positions, rows[order])
+        self._pending = {}
+
+    def _candidate_rows(self, keys: np.ndarray) -> np.ndarray:
+        starts = np.searchsorted(self._keys, keys, side="left")
+        ends = np.searchsorted(self._keys, keys, side="right")
+        rows = [self._key_rows[start:end] for start, end in zip(starts, ends) if end > start]
+        rows += [np.asarray(self._pending[key], dtype=np.int32)
+                 for key in keys.tolist() if key in self._pending]
+        if not rows:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(rows))
+
+    def chunk_ids(self) -> List[str]:
+        """Ids of all canonical chunks"""
+        return list(self._row_of)
+
+    def find_duplicate(self, signature: np.ndarray, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """Return the canonical chunk id this signature near-duplicates, if any.
+
+        Chunk ids in ``exclude`` are never returned (e.g. a meeting's own
+        chunks from an earlier ingest).
+        """
+        rows = [row for row in self._candidate_rows(self._band_keys(signature)).tolist()
+                if self._ids[row] is not None and not (exclude and self._ids[row] in exclude)]
+        if not rows:
+            return None
+
+        scores = (self._matrix[rows] == np.asarray(signature)).mean(axis=1)
+        best = int(np.argmax(scores))
+        return self._ids[rows[best]] if scores[best] >= self.threshold else None
+
+    def add_canonical(self, chunk_id: str, signature: np.ndarray) -> None:
+        self._drop_row(chunk_id)
+        row = len(self._ids)
+        if row == len(self._matrix):
+            grown = np.empty((max(64, 2 * row), self.num_perm), dtype=_SIGNATURE_DTYPE)
+            grown[:row] = self._matrix
+            self._matrix = grown
+        self._matrix[row] = signature
+        self._ids.append(chunk_id)
+        self._row_of[chunk_id] = row
+        for key in self._band_keys(signature).tolist():
+            self._pending.setdefault(key, []).append(row)
+        if len(self._pending) >= _PENDING_KEYS:
+            self._merge_pending()
+
+    def _drop_row(self, chunk_id: str) -> bool:
+        row = self._row_of.pop(chunk_id, None)
+        if row is None:
+            return False
+        self._ids[row] = None
+        return True
+
+    def add_reference(self, canonical_id: str, filename: str, chunk_index: int) -> None:
+        refs = self.references.setdefault(canonical_id, [])
+        ref = {"filename": filename, "chunk_index": chunk_index}
+        if ref not in refs:
+            refs.append(ref)
+
+    def remove_canonical(self, chunk_id: str) -> None:
+        self.references.pop(chunk_id, None)
+        self._drop_row(chunk_id)
+
+    def remove_references(self, filename: str) -> List[str]:
+        """Drop all back-references from a meeting, returning affected chunk ids"""
+        affected = []
+        for chunk_id, refs in self.references.items():
+            kept = [ref for ref in refs if ref["filename"] != filename]
+            if len(kept) != len(refs):
+                self.references[chunk_id] = kept
+                affected.append(chunk_id)
+        return affected
+
+    def file_hash(self, filename: str) -> Optional[str]:
+        return self.meetings.get(filename, {}).get("file_hash")
+
+    def record_ingest(self, filename: str, file_hash: str, seen: int, stored: int) -> None:
+        self.meetings[filename] = {"file_hash": file_hash, "chunks_seen": seen, "chunks_stored": stored}
+
+    def transfer_chunk(self, from_filename: str, to_filename: str) -> None:
+        """Move stored-chunk accounting when a canonical chunk changes owner"""
+        if from_filename in self.meetings:
+            self.meetings[from_filename]["chunks_stored"] -= 1
+        if to_filename in self.meetings:
+            self.meetings[to_filename]["chunks_stored"] += 1
+
+    def get_stats(self) -> Dict:
+        """How much deduplication shrank the index"""
+        seen = sum(m["chunks_seen"] for m in self.meetings.values())
+        stored = sum(m["chunks_stored"] for m in self.meetings.values())
+        return {
+            "chunks_seen": seen,
+            "chunks_stored": stored,
+            "duplicates_skipped": seen - stored,
+            "shrink_ratio": (seen - stored) / seen if seen else 0.0,
+        }
@@ -0,0 +1,242 @@
+import json
+import os
+import re
+import numpy as np
+from collections import Counter
+from typing import Dict, List
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+_TOKEN_RE = re.compile(r"[^\W\d_]{3,}", re.UNICODE)
+_SPEAKER_RE = re.compile(r"^\s*([A-ZÄÖÜ][\w'-]+(?: [A-ZÄÖÜ][\w'-]+)?)\s*:", re.MULTILINE)
+_PAGE_HEADER_RE = re.compile(r"^\s*(?:\S+\s+)?(?:Seite|Page)\s+\d+\s*$", re.MULTILINE | re.IGNORECASE)
+_NAME_RE = re.compile(r"\b[A-ZÄÖÜ][a-zäöüß]+\b")
+
+STOPWORDS = set("""
+aber alle allem allen aller alles also auch auf aus bei beim bin bis bzw dann
+das dass dem den denn der des die dies diese diesem diesen dieser dieses doch
+dort durch ein eine einem einen einer eines einfach etwas euch euer für gibt
+habe haben hat hatte hier ich ihr ihre ihren ihnen immer ist jetzt kann kein
+keine können könnte mal man mehr mein mich mir mit muss müssen nach nicht
+nichts noch nur oder ohne schon sehr sein seine sich sie sind soll sollen
+sondern sowie über uns unser unsere unter vom von vor war waren warum was weil
+wenn wer werde werden wie wieder will wir wird wirklich wo wurde würde zum zur
+zwar zwischen genau okay ganz gerade eben halt eigentlich vielleicht glaube
+also ja nein gut dazu davon damit dafür darauf einmal heute gesagt sagen
+und als wäre wären irgendwie irgendwo bisschen seite machen frage fragen
+quasi sozusagen natürlich vielleicht momentan letztendlich tatsächlich
+denke meine meinen meiner weiß sehen sieht gehen geht kommt kommen klar
+einen beispiel sache punkt thema themen mich dich euch wirklich danke
+hatten hätte hätten haben gemacht machen macht sagt sage gesehen gerne
+the and for that this with you are was have not but they what all were when
+there can will would about which their your from been has had more also into
+just like some could them than then only other our out its yes okay right
+""".split())
+
+DIGEST_KEYWORDS = 8
+DIGEST_SENTENCES = 3
+
+# Bump when digest contents change so stored digests are rebuilt
+DIGEST_VERSION = 2
+
+# Names mentioned fewer times than this are not reported as participants
+MIN_NAME_MENTIONS = 2
+
+# Transcripts have no speaker labels, so participant detection keys on known
+# first names. Add a team's names with MEETING_PARTICIPANT_NAMES="Name1,Name2".
+FIRST_NAMES = set("""
+Alexander Andrea Andreas Anna Albrecht Alex Ali Anja Anke Axel Benjamin Bernd
+Birgit Carsten Christian Christina Christine Christoph Claudia Daniel Daniela
+David Deborah Dennis Dieter Dirk Elena Emma Eva Fabian Felix Florian Frank
+Franziska Frederik Hannah Hans Heike Helmut Ingo Jakob Jan Jana Jens Jessica
+Johannes Johnny John Jonas Jörg Julia Julian Jürgen Karin Katharina Kathrin
+Kevin Kim Klaus Lars Laura Lea Lena Leon Lisa Lukas Manuel Marc Marcel Marco
+Maria Marie Mario Markus Martin Martina Matthias Max Maximilian Michael Michaela
+Mustafa Nadine Niklas Nikolai Nina Oliver Patrick Paul Peter Philipp Rainer
+Ralf Robert Sabine Sandra Sara Sarah Sebastian Selina Simon Sophie Stefan
+Stefanie Stephan Sven Thomas Tim Tobias Torsten Ulrich Uwe Werner Wolfgang Yvonne
+""".split()) | set(os.environ.get("MEETING_PARTICIPANT_NAMES", "").replace(",", " ").split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into whitespace-normalized sentences of a useful length"""
+    sentences = []
+    for raw in _SENTENCE_RE.split(_PAGE_HEADER_RE.sub("", text)):
+        sentence = " ".join(raw.split())
+        if 8 <= len(sentence.split()) <= 40:
+            sentences.append(sentence)
+    return sentences
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _textrank(similarity: np.ndarray, damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """PageRank over a sentence similarity matrix"""
+    n = len(similarity)
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    row_sums[row_sums == 0] = 1.0
+    transition = similarity / row_sums
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        scores = (1 - damping) / n + damping * (transition.T @ scores)
+    return scores
+
+
+def _count_names(text: str, speakers: Counter, first_names: Counter) -> None:
+    speakers.update(_SPEAKER_RE.findall(text))
+    first_names.update(word for word in _NAME_RE.findall(text) if word in FIRST_NAMES)
+
+
+def _rank_names(speakers: Counter, first_names: Counter, limit: int) -> List[str]:
+    names = speakers if speakers else first_names
+    return [name for name, count in names.most_common(limit) if count >= MIN_NAME_MENTIONS]
+
+
+def detect_participants(text: str, limit: int = 8) -> List[str]:
+    """Best-effort participant detection.
+
+    Uses "Name:" speaker labels when the transcript has them, otherwise known
+    first names. Only names mentioned repeatedly are returned.
+    """
+    counters = (Counter(), Counter())
+    _count_names(text, *counters)
+    return _rank_names(*counters, limit)
+
+
+class DigestBuilder:
+    """Builds a meeting digest one chunk at a time in bounded memory.
+
+    Term, noun and name statistics are kept as counters over the whole
+    meeting; TextRank only runs over a pool of at most ``max_candidates``
+    sentences, thinned evenly across the meeting when it overflows.
+    """
+
+    def __init__(self, max_candidates: int = 1000):
+        self.max_candidates = max_candidates
+        self.candidates = []  # (sentence, chunk embedding)
+        self._candidate_set = set()
+        self._stride = 1
+        self._sentence_count = 0
+        self._previous_sentences = set()
+        self.term_counts = Counter()
+        self.document_frequency = Counter()
+        self.capitalized = set()
+        self.name_counters = (Counter(), Counter())
+        self.embedding_sum = None
+        self.chunks = 0
+
+    def add_chunk(self, chunk: str, embedding=None) -> None:
+        if embedding is not None:
+            # Copy: a row view would keep the whole embedding batch alive
+            embedding = np.array(embedding, dtype=np.float32)
+            self.embedding_sum = embedding.copy() if self.embedding_sum is None else self.embedding_sum + embedding
+        _count_names(chunk, *self.name_counters)
+        # Favour nouns: in German transcripts they are capitalized mid-sentence
+        self.capitalized.update(t.lower() for t in re.findall(r"(?<=[a-zäöüß,] )[A-ZÄÖÜ]\w+", chunk))
+
+        chunk_sentences = split_sentences(chunk)
+        if self.chunks > 0:
+            # Chunks start inside the previous chunk's overlap, mid-sentence
+            chunk_sentences = chunk_sentences[1:]
+        self.chunks += 1
+
+        current = set(chunk_sentences)
+        for sentence in chunk_sentences:
+            if sentence in self._previous_sentences:
+                continue
+            tokens = _tokens(sentence)
+            self.term_counts.update(tokens)
+            self.document_frequency.update(set(tokens))
+            if self._sentence_count % self._stride == 0 and sentence not in self._candidate_set:
+                self.candidates.append((sentence, embedding))
+                self._candidate_set.add(sentence)
+            self._sentence_count += 1
+
+        if len(self.candidates) > self.max_candidates:
+            self.candidates = self.candidates[::2]
+            self._candidate_set = {sentence for sentence, _ in self.candidates}
+            self._stride *= 2
+        self._previous_sentences = current
+
+    def finish(self) -> Dict:
+        digest = {"version": DIGEST_VERSION, "keywords": [], "preview": [],
+                  "participants": _rank_names(*self.name_counters, 8)}
+        if not self.candidates:
+            return digest
+        sentences = [sentence for sentence, _ in self.candidates]
+
+        vocabulary = {}
+        sentence_tokens = [_tokens(s) for s in sentences]
+        for tokens in sentence_tokens:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+        if not vocabulary:
+            digest["preview"] = sentences[:DIGEST_SENTENCES]
+            return digest
+
+        tf = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(sentence_tokens):
+            for token in tokens:
+                tf[row, vocabulary[token]] += 1.0
+        document_frequency = np.count_nonzero(tf, axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1.0
+        # In place: this matrix is the digest's peak memory
+        tfidf = tf
+        tfidf *= idf
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        tfidf /= norms
+
+        scores = _textrank(tfidf @ tfidf.T)
+
+        # Favour sentences from chunks close to the meeting's overall topic
+        if self.embedding_sum is not None:
+            centroid = self.embedding_sum / (np.linalg.norm(self.embedding_sum) or 1.0)
+            # Sentences whose chunk has no embedding count as not central
+            embeddings = np.stack([np.zeros_like(centroid) if e is None else e for _, e in self.candidates])
+            chunk_norms = np.linalg.norm(embeddings, axis=1)
+            chunk_norms[chunk_norms == 0] = 1.0
+            centrality = (embeddings @ centroid) / chunk_norms
+            scores *= 1.0 + np.clip(centrality, 0.0, None)
+
+        top = np.argsort(-scores)[:DIGEST_SENTENCES]
+        digest["preview"] = [sentences[i] for i in sorted(top)]
+
+        terms = list(self.term_counts)
+        counts = np.array([self.term_counts[t] for t in terms], dtype=np.float32)
+        term_df = np.array([self.document_frequency[t] for t in terms])
+        term_idf = np.log((1 + self._sentence_count) / (1 + term_df)) + 1.0
+        noun_boost = np.array([2.0 if t in self.capitalized else 1.0 for t in terms], dtype=np.float32)
+        noun_boost[[i for i, t in enumerate(terms) if t.capitalize() in FIRST_NAMES]] = 0.0
+        keyword_scores = counts * term_idf * noun_boost
+        digest["keywords"] = [terms[i] for i in np.argsort(-keyword_scores)[:DIGEST_KEYWORDS]]
+        return digest
+
+
+def build_digest(chunks: List[str], embeddings: np.ndarray) -> Dict:
+    """Extractive digest of one meeting: keywords, preview sentences, participants.
+
+    Sentences are ranked with TextRank over TF-IDF similarities, weighted by
+    how central their chunk's embedding is to the whole meeting.
+    """
+    builder = DigestBuilder()
+    embeddings = embeddings if len(embeddings) == len(chunks) else [None] * len(chunks)
+    for chunk, embedding in zip(chunks, embeddings):
+        builder.add_chunk(chunk, embedding)
+    return builder.finish()
+
+
+def load_digests(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_digests(path: str, digests: Dict[str, Dict]) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(digests, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
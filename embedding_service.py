@@ -0,0 +1,210 @@
+"""Shared embedding service for multiple app workers.
+
+Run one per host so Streamlit processes and replicas share a single copy of
+the sentence-transformer model:
+
+    python embedding_service.py [--host 127.0.0.1] [--port 8765]
+
+Requests arriving within a short window are merged into one model batch.
+Clients (``get_embedder``) fall back to an in-process model when the service
+is not running.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+import requests
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+EMBEDDING_SERVICE_URL = os.environ.get("MEETING_EMBEDDING_SERVICE", "http://127.0.0.1:8765")
+
+# Micro-batching: wait this long for more requests before running the model
+BATCH_WINDOW_SECONDS = 0.01
+MAX_BATCH_TEXTS = 256
+
+# How long a client waits before re-checking a service that was unreachable
+RECHECK_SECONDS = 60
+
+
+class MicroBatcher:
+    """Collects encode requests from many threads and runs them as one batch"""
+
+    def __init__(self, model, window: float = BATCH_WINDOW_SECONDS, max_texts: int = MAX_BATCH_TEXTS):
+        self.model = model
+        self.window = window
+        self.max_texts = max_texts
+        self._requests: "queue.Queue" = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        future = Future()
+        self._requests.put((texts, future))
+        return future.result()
+
+    def _worker(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.window
+            while count < self.max_texts:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                embeddings = self.model.encode(texts, normalize_embeddings=True)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for item_texts, future in batch:
+                future.set_result(embeddings[start:start + len(item_texts)])
+                start += len(item_texts)
+
+
+def make_handler(batcher: MicroBatcher, model_name: str, dimension: int):
+    class EmbeddingHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"model": model_name, "dimension": dimension})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/embed":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                embeddings = batcher.encode(body["texts"])
+                self._send_json(200, {"model": model_name, "embeddings": embeddings.tolist()})
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return EmbeddingHandler
+
+
+class RemoteEmbedder:
+    """Client for the embedding service with the SentenceTransformer encode interface"""
+
+    def __init__(self, url: str, model_name: str, dimension: int):
+        self.url = url
+        self.model_name = model_name
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        response = requests.post(f"{self.url}/embed", json={"texts": list(texts)}, timeout=60)
+        response.raise_for_status()
+        return np.asarray(response.json()["embeddings"], dtype=np.float32)
+
+
+class FallbackEmbedder:
+    """Uses the embedding service when it is up, otherwise an in-process model.
+
+    The local model is only loaded the first time the service is unavailable.
+    """
+
+    def __init__(self, model_name: str, url: str = EMBEDDING_SERVICE_URL):
+        self.model_name = model_name
+        self.url = url
+        self._remote = None
+        self._local = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+
+    def _connect(self):
+        """Return a RemoteEmbedder if the service is reachable and serves our model"""
+        with self._connect_lock:
+            if self._remote is not None or time.monotonic() < self._next_check:
+                return self._remote
+            try:
+                health = requests.get(f"{self.url}/health", timeout=0.5).json()
+                if health["model"] == self.model_name:
+                    self._remote = RemoteEmbedder(self.url, self.model_name, health["dimension"])
+                    print(f"Using embedding service at {self.url}")
+                else:
+                    print(f"Embedding service at {self.url} serves {health['model']}, not {self.model_name}")
+            except Exception:
+                pass
+            if self._remote is None:
+                self._next_check = time.monotonic() + RECHECK_SECONDS
+            return self._remote
+
+    def _local_model(self):
+        with self._lock:
+            if self._local is None:
+                from sentence_transformers import SentenceTransformer
+                print(f"Embedding service unavailable, loading {self.model_name} in-process")
+                self._local = SentenceTransformer(self.model_name)
+            return self._local
+
+    def get_sentence_embedding_dimension(self) -> int:
+        remote = self._connect()
+        if remote is not None:
+            return remote.get_sentence_embedding_dimension()
+        return self._local_model().get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        remote = self._connect()
+        if remote is not None:
+            try:
+                return remote.encode(texts)
+            except Exception as e:
+                print(f"Embedding service request failed, falling back to local model: {e}")
+                self._remote = None
+                self._next_check = time.monotonic() + RECHECK_SECONDS
+        return self._local_model().encode(texts, normalize_embeddings=normalize_embeddings)
+
+
+def get_embedder(model_name: str) -> FallbackEmbedder:
+    return FallbackEmbedder(model_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the shared embedding service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    from vector_db import EMBEDDING_MODEL_NAME
+
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    batcher = MicroBatcher(model)
+    handler = make_handler(batcher, EMBEDDING_MODEL_NAME, model.get_sentence_embedding_dimension())
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Embedding service for {EMBEDDING_MODEL_NAME} listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import json
+import os
+import threading
+import numpy as np
+from typing import Dict, List, Optional
+
+# Spare rows are added in proportion to the index, so appends rarely rewrite it
+GROWTH_FACTOR = 1.5
+
+# Rows copied at a time when growing or compacting the index
+COPY_BATCH_ROWS = 65536
+
+
+class MemmapEmbeddingIndex:
+    """Exact cosine search over embeddings stored in a memory-mapped .npy file.
+
+    Rows of each meeting are stored contiguously; ``manifest.json`` keeps a
+    per-meeting offset table so scoped queries only touch that meeting's rows.
+    The file holds spare rows past ``manifest["rows"]`` that new meetings are
+    written into.
+    The instance is shared across sessions and threads, so reads and writes
+    hold one lock.
+    """
+
+    def __init__(self, index_directory: str = "./exact_index", dtype: str = "float16"):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported dtype {dtype}, use 'float16' or 'int8'")
+
+        self.index_directory = index_directory
+        self.dtype = dtype
+        self.embeddings_path = os.path.join(index_directory, "embeddings.npy")
+        self.scales_path = os.path.join(index_directory, "scales.npy")
+        self.manifest_path = os.path.join(index_directory, "manifest.json")
+        os.makedirs(index_directory, exist_ok=True)
+
+        self.manifest = {"dtype": dtype, "dim": None, "rows": 0, "meetings": {}}
+        self.documents: List[str] = []
+        self.ids: List[str] = []
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            self.documents = self.manifest.pop("documents", [])
+            self.ids = self.manifest.pop("ids", [])
+            if self.manifest["dtype"] != dtype:
+                raise ValueError(
+                    f"Index at {index_directory} uses {self.manifest['dtype']}, not {dtype}"
+                )
+
+        self._embeddings = None
+        self._scales = None
+        self._row_of = None
+        self._lock = threading.RLock()
+
+    def _open(self):
+        """Memory-map the embedding matrix (and int8 scales) lazily"""
+        if self._embeddings is None and os.path.exists(self.embeddings_path):
+            self._embeddings = np.load(self.embeddings_path, mmap_mode="r")
+            if self.dtype == "int8":
+                self._scales = np.load(self.scales_path, mmap_mode="r")
+        return self._embeddings
+
+    def _quantize(self, embeddings: np.ndarray):
+        """Convert float32 embeddings to the storage dtype"""
+        if self.dtype == "float16":
+            return embeddings.astype(np.float16), None
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _save_manifest(self):
+        data = dict(self.manifest, documents=self.documents, ids=self.ids)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def has_meeting(self, filename: str, file_hash: Optional[str] = None) -> bool:
+        """Check if a meeting (optionally with a specific hash) is indexed"""
+        with self._lock:
+            entry = self.manifest["meetings"].get(filename)
+            if entry is None:
+                return False
+            return file_hash is None or entry["file_hash"] == file_hash
+
+    def get_all_filenames(self) -> List[str]:
+        with self._lock:
+            return list(self.manifest["meetings"].keys())
+
+    def add_meeting(self, filename: str, file_hash: str, ids: List[str],
+                    documents: List[str], embeddings: np.ndarray,
+                    shared_ids: Optional[List[str]] = None) -> None:
+        """Append one meeting's chunk embeddings as a contiguous block of rows.
+
+        ``shared_ids`` lists chunks stored under another meeting (deduplicated)
+        that should also be searched for this one.
+        """
+        with self._lock:
+            if self.has_meeting(filename):
+                self.delete_meeting(filename)
+
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            new_rows, new_scales = self._quantize(embeddings / norms)
+
+            old_rows = self.manifest["rows"]
+            self._append_rows(new_rows, new_scales)
+
+            self.manifest["dim"] = int(embeddings.shape[1])
+            self.manifest["rows"] = old_rows + len(new_rows)
+            self.manifest["meetings"][filename] = {
+                "offset": old_rows,
+                "count": len(new_rows),
+                "file_hash": file_hash,
+                "shared_ids": list(shared_ids or []),
+            }
+            self.ids.extend(ids)
+            self.documents.extend(documents)
+            self._row_of = None
+            self._save_manifest()
+
+    def _capacity(self) -> int:
+        """Rows allocated in the .npy file, used or not"""
+        embeddings = self._open()
+        return 0 if embeddings is None else len(embeddings)
+
+    def _append_rows(self, rows: np.ndarray, scales: Optional[np.ndarray]) -> None:
+        """Write new rows into the spare rows after the used ones, growing the files when full"""
+        used = self.manifest["rows"]
+        needed = used + len(rows)
+        if not len(rows):
+            return
+        if needed > self._capacity():
+            capacity = max(needed, int(self._capacity() * GROWTH_FACTOR))
+            self._rewrite(capacity, rows.shape[1], [(0, used)])
+
+        embeddings = np.lib.format.open_memmap(self.embeddings_path, mode="r+")
+        embeddings[used:needed] = rows
+        embeddings.flush()
+        del embeddings
+        if scales is not None:
+            all_scales = np.lib.format.open_memmap(self.scales_path, mode="r+")
+            all_scales[used:needed] = scales
+            all_scales.flush()
+            del all_scales
+        self._embeddings = None
+        self._scales = None
+
+    def _rewrite(self, capacity: int, dim: int, blocks: List[tuple]) -> None:
+        """Copy the given (start, stop) row blocks, in order, into fresh files of ``capacity`` rows.
+
+        Rows are copied in slices through temporary memmaps, so memory use
+        does not grow with the size of the index.
+        """
+        old = self._open()
+        old_scales = self._scales
+        storage_dtype = np.float16 if self.dtype == "float16" else np.int8
+        targets = [(self.embeddings_path, old, storage_dtype, (capacity, dim))]
+        if self.dtype == "int8":
+            targets.append((self.scales_path, old_scales, np.float32, (capacity,)))
+
+        for path, source, dtype, shape in targets:
+            tmp_path = path + ".tmp.npy"
+            out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+            position = 0
+            for start, stop in blocks:
+                for batch in range(start, stop, COPY_BATCH_ROWS):
+                    end = min(batch + COPY_BATCH_ROWS, stop)
+                    out[position:position + end - batch] = source[batch:end]
+                    position += end - batch
+            out.flush()
+            del out
+
+        self._embeddings = None
+        self._scales = None
+        for path, _, _, _ in targets:
+            os.replace(path + ".tmp.npy", path)
+
+    def delete_meeting(self, filename: str) -> bool:
+        """Remove a meeting's rows and compact the index"""
+        with self._lock:
+            entry = self.manifest["meetings"].pop(filename, None)
+            if entry is None:
+                return False
+
+            start, count = entry["offset"], entry["count"]
+            used = self.manifest["rows"]
+            if count and start + count < used:
+                # The last block just becomes spare rows; anything else is compacted
+                self._rewrite(self._capacity(), self.manifest["dim"],
+                              [(0, start), (start + count, used)])
+
+            del self.ids[start:start + count]
+            del self.documents[start:start + count]
+            self._row_of = None
+            for other in self.manifest["meetings"].values():
+                if other["offset"] > start:
+                    other["offset"] -= count
+            self.manifest["rows"] -= count
+            self._save_manifest()
+            return True
+
+    def _scores(self, query: np.ndarray, rows) -> np.ndarray:
+        """Cosine scores of a normalized query against the given rows"""
+        embeddings = self._open()[rows]
+        scores = embeddings.astype(np.float32) @ query
+        if self.dtype == "int8":
+            scores *= self._scales[rows]
+        return scores
+
+    def _shared_rows(self, entry: Dict) -> np.ndarray:
+        """Row numbers of deduplicated chunks shared into a meeting"""
+        if self._row_of is None:
+            self._row_of = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        rows = [self._row_of[i] for i in entry.get("shared_ids", []) if i in self._row_of]
+        return np.asarray(rows, dtype=np.int64)
+
+    def query(self, query_embedding: np.ndarray, filename: str, top_k: int = 5) -> List[Dict]:
+        """Exact top-k search restricted to one meeting"""
+        with self._lock:
+            entry = self.manifest["meetings"].get(filename)
+            if entry is None:
+                return []
+
+            query = np.asarray(query_embedding, dtype=np.float32).ravel()
+            query = query / (np.linalg.norm(query) or 1.0)
+
+            start, count = entry["offset"], entry["count"]
+            row_numbers = np.arange(start, start + count)
+            scores = self._scores(query, slice(start, start + count)) if count else np.empty(0)
+
+            shared = self._shared_rows(entry)
+            if len(shared):
+                row_numbers = np.concatenate([row_numbers, shared])
+                scores = np.concatenate([scores, self._scores(query, shared)])
+
+            if len(scores) == 0:
+                return []
+
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {
+                    "id": self.ids[row_numbers[i]],
+                    "document": self.documents[row_numbers[i]],
+                    "score": float(scores[i]),
+                }
+                for i in top
+            ]
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import os
+import threading
+import socket
+import requests
+import streamlit as st
+from typing import Callable, Dict, Iterator, List, Optional
+from scheduler import QueueFullError, RequestCancelled, Ticket, get_scheduler
+
+OLLAMA_URL = "http://localhost:11434"
+
+# Routing table: which model serves which task and how much room it gets.
+# Edit this in one place to change models or context limits for the whole app.
+MODEL_ROUTES = {
+    # Short retrieval-grounded questions. Point MEETING_CHAT_MODEL at a small
+    # quantized model (e.g. llama3.2:3b-instruct-q4_K_M) once it is pulled.
+    "chat": {
+        "model": os.environ.get("MEETING_CHAT_MODEL", "llama3.1:8b"),
+        "max_ctx": 8192,
+        "response_tokens": 512,
+        "priority": "interactive",
+    },
+    # Full-transcript summaries -> the larger model pinned in the Modelfile
+    "summary": {
+        "model": "llama3.1:8b",
+        "max_ctx": 131072,
+        "response_tokens": 2048,
+        "priority": "summary",
+    },
+}
+
+# Task used when a prompt no longer fits the context of its own route
+# (e.g. chat falling back to the full transcript)
+OVERFLOW_TASK = "summary"
+
+# Allowed num_ctx values; the smallest one that fits the prompt is used
+NUM_CTX_BUCKETS = [2048, 4096, 8192, 16384, 32768, 65536, 131072]
+
+# How long Ollama keeps a model loaded after its last request
+KEEP_ALIVE = "10m"
+
+# Rough characters per token for Llama tokenizers on mixed German/English text
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text"""
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def pick_num_ctx(needed_tokens: int, max_ctx: int) -> int:
+    """Return the smallest context bucket that holds the needed tokens"""
+    for bucket in NUM_CTX_BUCKETS:
+        if bucket > max_ctx:
+            break
+        if bucket >= needed_tokens:
+            return bucket
+    return max_ctx
+
+
+def route_request(prompt: str, task: str = "chat") -> Dict:
+    """Choose model and options for a prompt of the given task"""
+    route = MODEL_ROUTES[task]
+    prompt_tokens = estimate_tokens(prompt)
+    needed = prompt_tokens + route["response_tokens"]
+
+    if needed > route["max_ctx"] and task != OVERFLOW_TASK:
+        # Prompt too long for this route, hand it to the large model
+        return route_request(prompt, OVERFLOW_TASK)
+
+    return {
+        "task": task,
+        "model": route["model"],
+        "prompt_tokens": prompt_tokens,
+        "options": {"num_ctx": pick_num_ctx(needed, route["max_ctx"])},
+    }
+
+
+def build_payload(messages: List[Dict], task: str = "chat") -> Dict:
+    """Build an Ollama /api/chat payload with routing applied"""
+    prompt = "\n".join(m["content"] for m in messages)
+    route = route_request(prompt, task)
+
+    print(
+        f"[model_router] task={route['task']} model={route['model']} "
+        f"prompt_tokens~{route['prompt_tokens']} num_ctx={route['options']['num_ctx']}"
+    )
+
+    return {
+        "model": route["model"],
+        "messages": messages,
+        "options": route["options"],
+        "keep_alive": KEEP_ALIVE,
+        "stream": True,
+    }
+
+
+class ModelNotFoundError(RuntimeError):
+    """Raised when Ollama does not have the requested model pulled"""
+
+
+def _stream_ollama(payload: Dict, on_open: Optional[Callable] = None) -> Iterator[str]:
+    """Yield reply tokens from a streaming Ollama /api/chat request.
+
+    ``on_open`` receives the response as soon as it exists, so another
+    thread can abort the stream with _close_response.
+    """
+    with requests.post(f"{OLLAMA_URL}/api/chat", json=payload, stream=True) as response:
+        if on_open is not None:
+            on_open(response)
+        if response.status_code == 404:
+            raise ModelNotFoundError(f"Ollama has no model {payload['model']}, run: ollama pull {payload['model']}")
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama returned status {response.status_code}")
+        for line in response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if "error" in data:
+                raise RuntimeError(f"Ollama error: {data['error']}")
+            token = data.get("message", {}).get("content", "")
+            if token:
+                yield token
+            if data.get("done"):
+                break
+
+
+def _close_response(response: requests.Response) -> None:
+    """Close a streaming response from another thread.
+
+    Closing alone leaves the reading thread blocked until Ollama sends the
+    next token (which can be minutes away during prompt evaluation), so the
+    socket is shut down first to wake it and drop the connection at once.
+    """
+    sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
+
+
+class Flight:
+    """One in-flight generation whose token stream any number of readers can follow.
+
+    Every start() that returns the flight counts as a reader, and each
+    reader detaches once (stream() does so when it ends or is closed).
+    When the last reader detaches before the generation is done, it is
+    cancelled.
+    """
+
+    def __init__(self, ticket: Ticket, owner: "SingleFlight" = None, key: tuple = None):
+        self.ticket = ticket
+        self.owner = owner
+        self.key = key
+        self.tokens: List[str] = []
+        self.done = False
+        self.error = None
+        self.readers = 1
+        self.cancelled = False
+        self._response = None
+        self._cond = threading.Condition()
+
+    def publish(self, token: str) -> None:
+        with self._cond:
+            self.tokens.append(token)
+            self._cond.notify_all()
+
+    def queue_position(self) -> int:
+        """Position in the model queue, 0 once generation has started"""
+        return self.ticket.position()
+
+    def finish(self, error: Exception = None) -> None:
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._response = None
+            self._cond.notify_all()
+
+    def attach_response(self, response: requests.Response) -> None:
+        """Remember the Ollama response so cancel() can close it"""
+        with self._cond:
+            self._response = response
+            cancelled = self.cancelled
+        if cancelled:
+            _close_response(response)
+
+    def detach(self) -> None:
+        """Stop following this flight; cancels it when no reader is left"""
+        if self.owner is not None:
+            self.owner.detach(self)
+
+    def cancel(self) -> None:
+        """Abort the generation: leave the queue, or close the Ollama stream"""
+        with self._cond:
+            if self.done or self.cancelled:
+                return
+            self.cancelled = True
+            response = self._response
+        if response is not None:
+            _close_response(response)
+        self.ticket.scheduler.release(self.ticket)
+
+    def stream(self) -> Iterator[str]:
+        """Replay tokens produced so far, then follow the live stream.
+
+        Detaches this reader when the stream ends or is closed early.
+        """
+        position = 0
+        try:
+            while True:
+                with self._cond:
+                    while position >= len(self.tokens) and not self.done:
+                        self._cond.wait()
+                    new_tokens = self.tokens[position:]
+                    position = len(self.tokens)
+                    finished, error = self.done, self.error
+                yield from new_tokens
+                if finished and position == len(self.tokens):
+                    if error is not None:
+                        raise error
+                    return
+        finally:
+            self.detach()
+
+
+class SingleFlight:
+    """Process-wide deduplication of identical in-flight LLM requests.
+
+    Requests are keyed on (model, options, prompt hash). The first caller
+    starts the generation in a background thread; concurrent identical
+    callers attach to its token stream instead of querying Ollama again.
+    Finished flights are dropped, so later requests generate afresh, and a
+    flight whose readers have all detached is cancelled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[tuple, Flight] = {}
+
+    @staticmethod
+    def flight_key(payload: Dict) -> tuple:
+        prompt = json.dumps(payload["messages"], sort_keys=True, ensure_ascii=False)
+        return (
+            payload["model"],
+            json.dumps(payload.get("options", {}), sort_keys=True),
+            hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        )
+
+    def start(self, payload: Dict, priority_class: str) -> Flight:
+        """Join an identical in-flight request or queue a new one.
+
+        Raises QueueFullError right away when the scheduler rejects it.
+        """
+        key = self.flight_key(payload)
+        scheduler = get_scheduler()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = Flight(scheduler.enqueue(priority_class), self, key)
+                self._flights[key] = flight
+                threading.Thread(target=self._run, args=(key, flight, payload), daemon=True).start()
+            else:
+                flight.readers += 1
+                scheduler.promote(flight.ticket, priority_class)
+                print(f"[model_router] attached to in-flight request model={key[0]} "
+                      f"prompt={key[2][:12]} readers={flight.readers}")
+        return flight
+
+    def detach(self, flight: Flight) -> None:
+        with self._lock:
+            flight.readers -= 1
+            if flight.readers > 0 or flight.done:
+                return
+            # Identical requests from now on start a fresh generation
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        print(f"[model_router] cancelling request model={flight.key[0]} "
+              f"prompt={flight.key[2][:12]}: no readers left")
+        flight.cancel()
+
+    def is_running(self, model: str) -> bool:
+        """True while any request for this model is queued or generating"""
+        with self._lock:
+            return any(key[0] == model for key in self._flights)
+
+    def _run(self, key: tuple, flight: Flight, payload: Dict) -> None:
+        scheduler = flight.ticket.scheduler
+        try:
+            scheduler.wait(flight.ticket)
+            try:
+                for token in _stream_ollama(payload, flight.attach_response):
+                    flight.publish(token)
+            except ModelNotFoundError as e:
+                fallback = MODEL_ROUTES[OVERFLOW_TASK]["model"]
+                if flight.tokens or payload["model"] == fallback:
+                    raise
+                print(f"[model_router] {e}; falling back to model={fallback}")
+                for token in _stream_ollama(dict(payload, model=fallback), flight.attach_response):
+                    flight.publish(token)
+            if flight.cancelled:
+                raise RequestCancelled("Request was cancelled")
+            flight.finish()
+        except Exception as e:
+            flight.finish(RequestCancelled("Request was cancelled") if flight.cancelled else e)
+        finally:
+            scheduler.release(flight.ticket)
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+
+@st.cache_resource
+def get_single_flight():
+    """Coordinator shared by all Streamlit sessions in this process (cached)"""
+    return SingleFlight()
+
+
+def start_chat(prompt: str, task: str = "chat", priority: Optional[str] = None) -> Flight:
+    """Queue a single user prompt (or join an identical in-flight one).
+
+    ``priority`` defaults to the task's class; use "batch" for background work.
+    """
+    payload = build_payload([{"role": "user", "content": prompt}], task)
+    return get_single_flight().start(payload, priority or MODEL_ROUTES[task]["priority"])
+
+
+def stream_chat(prompt: str, task: str = "chat", priority: Optional[str] = None) -> Iterator[str]:
+    """Stream the reply to a single user prompt, sharing identical in-flight requests"""
+    return start_chat(prompt, task, priority).stream()
+
+
+def chat_completion(prompt: str, task: str = "chat", priority: Optional[str] = None) -> str:
+    """Send a single user prompt to Ollama and return the reply text"""
+    return "".join(stream_chat(prompt, task, priority))
+
+
+_warming = set()
+_warming_lock = threading.Lock()
+
+
+def warm_model(task: str = "summary") -> bool:
+    """Load a task's model into Ollama ahead of time (an empty generate request).
+
+    Goes through the scheduler at batch priority so a warm-up never loads or
+    evicts models while slot-limited generations run. Skipped when the model
+    already has a request in flight or another warm-up is pending.
+    """
+    model = MODEL_ROUTES[task]["model"]
+    if get_single_flight().is_running(model):
+        return True
+    with _warming_lock:
+        if model in _warming:
+            return True
+        _warming.add(model)
+
+    scheduler = get_scheduler()
+    try:
+        ticket = scheduler.enqueue("batch")
+    except QueueFullError:
+        print(f"[model_router] skipped warm-up of {model}: queue full")
+        with _warming_lock:
+            _warming.discard(model)
+        return False
+
+    try:
+        scheduler.wait(ticket)
+        response = requests.post(
+            f"{OLLAMA_URL}/api/generate",
+            json={"model": model, "keep_alive": KEEP_ALIVE},
+        )
+        print(f"[model_router] warmed model={model} status={response.status_code}")
+        return response.status_code == 200
+    except Exception as e:
+        print(f"[model_router] warm-up of {model} failed: {e}")
+        return False
+    finally:
+        scheduler.release(ticket)
+        with _warming_lock:
+            _warming.discard(model)
@@ -1,12 +1,19 @@
 import streamlit as st
 import os
-import fitz  # PyMuPDF
-import requests
 import base64
+import time
 from vector_db import get_vector_db, retrieve_relevant_context
+from model_router import start_chat
+from scheduler import QueueFullError
+from summary_prompts import SUMMARIZATION_OPTIONS
+from prefetch import get_prefetcher
+from transcript_stream import page_count, read_page
 
 # ⬅️ Back button
 if st.button("⬅️ Back to Home"):
+    # Leaving without choosing a style: stop the speculative summary
+    if "speculative_meeting" in st.session_state:
+        get_prefetcher().discard_speculative(st.session_state.pop("speculative_meeting"))
     st.switch_page("Home.py")
 
 st.set_page_config(page_title="Summarize Meeting", layout="wide")
@@ -37,17 +44,8 @@ pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="30
 st.sidebar.markdown("### 📄 Meeting PDF")
 st.sidebar.markdown(pdf_display, unsafe_allow_html=True)
 
-# 📜 Extract text from PDF
-@st.cache_data
-def extract_text_from_pdf(path):
-    doc = fitz.open(path)
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text()
-    return full_text.strip()
-
-transcript_text = extract_text_from_pdf(transcript_path)
-word_count = len(transcript_text.split())
+# 📜 The full transcript is only loaded for summaries (usually prefetched when the meeting was opened)
+prefetcher = get_prefetcher()
 
 # Check if this meeting is in the vector database
 vector_db = get_vector_db()
@@ -96,171 +94,73 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# 🔍 Expandable view of full transcript
-with st.expander("📄 View full transcript"):
-    st.text_area("Transcript", transcript_text, height=300)
-
-# Dictionary of button labels and their corresponding prompts
-# Note: Summaries use full transcript for completeness, but chat uses vector retrieval for efficiency
-summarization_options = {
-    "📝 Cornell Notes": """
-You are a meeting assistant. Create a Cornell Notes summary immediately.
-
-STRICT INSTRUCTIONS:
-- Do NOT comment on text length or complexity
-- Do NOT use phrases like "I'm sorry", "appears to", "seems like"
-- Start IMMEDIATELY with the Cornell Notes format
-- Use ONLY information from the transcript
-
-FORMAT (follow exactly):
-PARTICIPANTS:
-• [List each person and their role]
-
-NOTES:
-• [Key discussion points]
-• [Important decisions made]
-• [Technical details discussed]
-
-CUES:
-• [Main topics/keywords]
-• [Action items]
-• [Deadlines mentioned]
-
-SUMMARY:
-[2-3 sentences covering the main outcomes and next steps]
-
-LANGUAGE: Always respond in the language of the transcript.
-
-TRANSCRIPT:
-{transcript_text}
-""",
-    
-    "📝 1 to 1 Meeting": """
-You are an expert in meeting notes. I am having a 1:1 meeting with someone in my team, please capture these meeting notes in a concise and actionable format. Focus on immediate priorities, progress, challenges, and personal feedback, ensuring the notes are structured for clarity, efficiency and easy follow-up. Please highlight key phrases and organize content hierarchically in the generated notes.
-
-RULES:
-- No preamble or explanatory text
-- Start directly with the meeting content
-- Focus on actionable items and feedback
-- Organize hierarchically with clear structure
-- Highlight key phrases
-
-LANGUAGE: Always respond in the language of the transcript.
-
-TRANSCRIPT:
-{transcript_text}
-""",
-    
-    "📋 Meeting Summary": """
-Summarize given text into a well-formed meeting summary, and present the results using markdown format. Please highlight key phrases in the generated notes. Do not show results that cannot be generated.
-
-RULES:
-- Use markdown format for structure
-- Highlight key phrases
-- Present clear, well-formed summary
-- Only include content that can be generated from the transcript
-
-LANGUAGE: Always respond in the language of the transcript.
-
-TRANSCRIPT:
-{transcript_text}
-""",
-    
-    "🧠 Feynman Tech": """
-Turn the given text into a detailed study note using Feynman Technique to help the user to achieve a deep and intuitive understanding of the topic. The output should include a clear, simplified explanation of the topic, identification, and resolution of knowledge gaps, and a refined explanation that is ready for teaching. Each step should be documented thoroughly to ensure a comprehensive understanding. Please highlight key phrases and organize content hierarchically in the generated notes.
-
-RULES:
-- Apply Feynman Technique methodology
-- Create detailed study notes for deep understanding
-- Include simplified explanations and knowledge gap resolution
-- Document each step thoroughly
-- Highlight key phrases and organize hierarchically
+@st.cache_data(max_entries=64)
+def transcript_page(path, page_number):
+    """Text of one transcript page (cached)"""
+    return read_page(path, page_number)
 
-LANGUAGE: Always respond in the language of the transcript.
-
-TRANSCRIPT:
-{transcript_text}
-""",
-    
-    "� Project Sync": """
-You are an expert in meeting notes. I participated in our project sync to get a clear picture of where we stand and what's coming up. My focus was on understanding our progress, identifying any hurdles, and ensuring we're all aligned on our next moves to keep things on track. Please highlight key phrases and organize content hierarchically in the generated notes.
-
-RULES:
-- Focus on project progress and alignment
-- Identify hurdles and next steps
-- Organize hierarchically with clear structure
-- Highlight key phrases for easy reference
-
-LANGUAGE: Always respond in the language of the transcript.
-
-TRANSCRIPT:
-{transcript_text}
-""",
-    
-    "� Brainstorming": """
-Summarize given text into a well-formed Brainstorm Notes, and present the results as follows use markdown format:
-## Ideas 1
-#### Key Concepts
-#### Pros & Cons
-#### Examples
-## Ideas ...
-#### Key Concepts
-#### Pros & Cons
-#### Examples
-## Exploration
-Please highlight key phrases and organize content hierarchically in the generated notes. Do not show results that cannot be generated.
-
-RULES:
-- Use the specified markdown format structure
-- Organize ideas with key concepts, pros & cons, and examples
-- Include exploration section
-- Highlight key phrases
-- Only show results that can be generated
-
-LANGUAGE: Always respond in the language of the transcript.
-
-TRANSCRIPT:
-{transcript_text}
-"""
-}
+# 🔍 Expandable view of the transcript, one page at a time
+with st.expander("📄 View full transcript"):
+    pages = page_count(transcript_path)
+    page_number = st.number_input("Page", min_value=1, max_value=max(pages, 1), value=1, step=1)
+    st.text_area(f"Transcript (page {page_number} of {pages})",
+                 transcript_page(transcript_path, page_number - 1) if pages else "", height=300)
+
+def wait_in_queue(flight):
+    """Show the user's queue position until their request starts generating"""
+    placeholder = st.empty()
+    try:
+        position = flight.queue_position()
+        while position > 0:
+            placeholder.info(f"⏳ Waiting for the model: position {position} in queue")
+            time.sleep(0.5)
+            position = flight.queue_position()
+    except BaseException:
+        # Rerun or navigation while queued: nobody will read this reply
+        flight.detach()
+        raise
+    placeholder.empty()
+
+def generate_summary(label, prompt_template):
+    """Use the speculative summary for this style if one was started, else generate now"""
+    prefetcher.record_style(label)
+    flight = None
+    if st.session_state.pop("speculative_meeting", None) == meeting_file:
+        flight = prefetcher.take_speculative(meeting_file, label)
+    if flight is None:
+        transcript_text = prefetcher.get_transcript(transcript_path)
+        prompt = prompt_template.format(transcript_text=transcript_text)
+        flight = start_chat(prompt, task="summary")
+    wait_in_queue(flight)
+    return "".join(flight.stream())
 
 # 🚀 Show initial summarization buttons ONLY if no summary has been generated yet
 if not st.session_state["summary"]:
     st.subheader("🧠 Choose Summarization Style")
     
     # Create inline buttons with unique keys
-    cols = st.columns(len(summarization_options))
-    for i, (label, prompt_template) in enumerate(summarization_options.items()):
+    cols = st.columns(len(SUMMARIZATION_OPTIONS))
+    for i, (label, prompt_template) in enumerate(SUMMARIZATION_OPTIONS.items()):
         with cols[i]:
             if st.button(label, type="secondary", use_container_width=True, key=f"initial_{i}"):
                 with st.spinner(f"Generating {label.split(' ')[1]} summary..."):
-                    prompt = prompt_template.format(transcript_text=transcript_text)
-                    
-                    payload = {
-                        "model": "llama3.1:latest",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "stream": False
-                    }
-
                     try:
-                        response = requests.post("http://localhost:11434/api/chat", json=payload)
-                        if response.status_code == 200:
-                            summary_content = response.json().get("message", {}).get("content", "")
-                            
-                            # Add summary to chat history as assistant message
-                            st.session_state.chat_history.append({
-                                "role": "assistant", 
-                                "content": f"**{label}**\n\n{summary_content}",
-                                "type": "summary"
-                            })
-                            
-                            # Set the main summary for backward compatibility
-                            st.session_state["summary"] = summary_content
-                            st.session_state["summary_type"] = label
-                            
-                            st.rerun()  # Refresh to show new message
-                        else:
-                            st.error("⚠️ Ollama inference failed.")
+                        summary_content = generate_summary(label, prompt_template)
+
+                        # Add summary to chat history as assistant message
+                        st.session_state.chat_history.append({
+                            "role": "assistant", 
+                            "content": f"**{label}**\n\n{summary_content}",
+                            "type": "summary"
+                        })
+
+                        # Set the main summary for backward compatibility
+                        st.session_state["summary"] = summary_content
+                        st.session_state["summary_type"] = label
+
+                        st.rerun()  # Refresh to show new message
+                    except QueueFullError as e:
+                        st.warning(f"⏳ {e}")
                     except Exception as e:
                         st.error(f"⚠️ Error contacting Ollama: {e}")
 
@@ -299,22 +199,15 @@ QUESTION:
 {user_input}
 """
 
-            chat_payload = {
-                "model": "llama3.1:latest",
-                "messages": [{"role": "user", "content": chat_prompt}],
-                "stream": False
-            }
-
             try:
-                response = requests.post("http://localhost:11434/api/chat", json=chat_payload)
-                if response.status_code == 200:
-                    reply = response.json().get("message", {}).get("content", "")
-                    st.session_state.chat_history.append({"role": "assistant", "content": reply})
-                    # Display assistant response immediately
-                    with st.chat_message("assistant"):
-                        st.markdown(reply)
-                else:
-                    st.error("⚠️ Ollama failed to generate a response.")
+                flight = start_chat(chat_prompt, task="chat")
+                wait_in_queue(flight)
+                # Stream the assistant response as it is generated
+                with st.chat_message("assistant"):
+                    reply = st.write_stream(flight.stream())
+                st.session_state.chat_history.append({"role": "assistant", "content": reply})
+            except QueueFullError as e:
+                st.warning(f"⏳ {e}")
             except Exception as e:
                 st.error(f"⚠️ Error contacting Ollama: {e}")
 
@@ -324,36 +217,26 @@ if st.session_state.get("summary"):
     st.subheader("🧠 Generate Another Summary")
     
     # Create inline buttons with unique keys
-    cols = st.columns(len(summarization_options))
-    for i, (label, prompt_template) in enumerate(summarization_options.items()):
+    cols = st.columns(len(SUMMARIZATION_OPTIONS))
+    for i, (label, prompt_template) in enumerate(SUMMARIZATION_OPTIONS.items()):
         with cols[i]:
             # Use unique keys to avoid button conflicts
             button_key = f"end_{i}_{len(st.session_state.chat_history)}"
             if st.button(label, type="secondary", use_container_width=True, key=button_key):
                 with st.spinner(f"Generating {label.split(' ')[1]} summary..."):
-                    prompt = prompt_template.format(transcript_text=transcript_text)
-                    
-                    payload = {
-                        "model": "llama3.1:latest",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "stream": False
-                    }
-
                     try:
-                        response = requests.post("http://localhost:11434/api/chat", json=payload)
-                        if response.status_code == 200:
-                            summary_content = response.json().get("message", {}).get("content", "")
-                            
-                            # Add summary to chat history as assistant message
-                            st.session_state.chat_history.append({
-                                "role": "assistant", 
-                                "content": f"**{label}**\n\n{summary_content}",
-                                "type": "summary"
-                            })
-                            
-                            st.rerun()  # Refresh to show new message
-                        else:
-                            st.error("⚠️ Ollama inference failed.")
+                        summary_content = generate_summary(label, prompt_template)
+
+                        # Add summary to chat history as assistant message
+                        st.session_state.chat_history.append({
+                            "role": "assistant", 
+                            "content": f"**{label}**\n\n{summary_content}",
+                            "type": "summary"
+                        })
+
+                        st.rerun()  # Refresh to show new message
+                    except QueueFullError as e:
+                        st.warning(f"⏳ {e}")
                     except Exception as e:
                         st.error(f"⚠️ Error contacting Ollama: {e}")
                         # Remove the expandable sections code completely
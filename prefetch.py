@@ -0,0 +1,200 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+import streamlit as st
+from model_router import MODEL_ROUTES, Flight, start_chat, warm_model
+from summary_prompts import SUMMARIZATION_OPTIONS
+from transcript_stream import iter_pdf_pages
+
+# Start generating the most-used summary style as soon as a meeting is opened.
+# Off by default: a speculative summary occupies the backend even if unused.
+SPECULATIVE_SUMMARY = os.environ.get("MEETING_SPECULATIVE_SUMMARY", "0") == "1"
+
+# A speculative summary nobody has claimed after this many seconds is cancelled
+SPECULATIVE_TIMEOUT = float(os.environ.get("MEETING_SPECULATIVE_TIMEOUT", "300"))
+
+# Number of extracted transcripts kept in memory
+TRANSCRIPT_CACHE_SIZE = 8
+
+
+class Speculation:
+    """A speculative summary of one style for one meeting.
+
+    ``future`` resolves to the summary's Flight once the transcript is
+    extracted; the speculation holds one reader on it until claimed or
+    cancelled. ``interested`` counts the sessions that opened the meeting.
+    """
+
+    def __init__(self, label: str, future: Future):
+        self.label = label
+        self.future = future
+        self.interested = 1
+        self.timer: Optional[threading.Timer] = None
+
+    def cancel(self) -> None:
+        """Stop the summary, or make sure it never starts"""
+        if self.timer is not None:
+            self.timer.cancel()
+        if not self.future.cancel():
+            self.future.add_done_callback(_detach_flight)
+
+
+def _detach_flight(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().detach()
+
+
+class MeetingPrefetcher:
+    """Background work started when a meeting is opened on the Home page.
+
+    Warms the summary model, extracts the transcript, touches the meeting's
+    retrieval index and optionally generates the most-used summary style
+    before the user picks one.
+
+    Model work runs on its own executor, so warm-ups and speculative
+    summaries waiting for a model slot never hold up transcript extraction.
+    """
+
+    def __init__(self, max_workers: int = 4, model_workers: int = 2):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self.model_executor = ThreadPoolExecutor(max_workers=model_workers, thread_name_prefix="prefetch-model")
+        self._lock = threading.Lock()
+        self._transcripts: "OrderedDict[str, Future]" = OrderedDict()
+        self._speculative = {}
+        self.style_counts = Counter()
+
+    def prefetch(self, meeting_file: str, vector_db=None, meetings_dir: str = "data/Meetings") -> bool:
+        """Kick off all background work for a meeting that is about to be opened.
+
+        Returns True when a speculative summary was started (or joined); the
+        caller then either claims it with take_speculative or lets it go
+        with discard_speculative.
+        """
+        path = os.path.join(meetings_dir, meeting_file)
+        self.model_executor.submit(warm_model, "summary")
+        transcript = self._transcript_future(path)
+
+        if vector_db is not None:
+            self.executor.submit(vector_db.warm_meeting, meeting_file)
+
+        if SPECULATIVE_SUMMARY:
+            self._start_speculative(meeting_file, transcript)
+            return True
+        return False
+
+    def _transcript_future(self, path: str) -> Future:
+        with self._lock:
+            future = self._transcripts.get(path)
+            if future is None:
+                future = self.executor.submit(extract_transcript, path)
+                self._transcripts[path] = future
+                while len(self._transcripts) > TRANSCRIPT_CACHE_SIZE:
+                    self._transcripts.popitem(last=False)
+            self._transcripts.move_to_end(path)
+            return future
+
+    def get_transcript(self, path: str) -> str:
+        """Transcript text, from the prefetch if it ran, otherwise extracted now"""
+        future = self._transcript_future(path)
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                if self._transcripts.get(path) is future:
+                    del self._transcripts[path]
+            raise
+
+    def most_used_style(self) -> str:
+        if self.style_counts:
+            return self.style_counts.most_common(1)[0][0]
+        return next(iter(SUMMARIZATION_OPTIONS))
+
+    def record_style(self, label: str) -> None:
+        with self._lock:
+            self.style_counts[label] += 1
+
+    def _start_speculative(self, meeting_file: str, transcript: Future) -> None:
+        label = self.most_used_style()
+        with self._lock:
+            current = self._speculative.get(meeting_file)
+            if current is not None and current.label == label:
+                current.interested += 1
+                return
+
+            def start():
+                prompt = SUMMARIZATION_OPTIONS[label].format(transcript_text=transcript.result())
+                return start_chat(prompt, task="summary", priority="batch")
+
+            speculation = Speculation(label, self.model_executor.submit(start))
+            speculation.timer = threading.Timer(SPECULATIVE_TIMEOUT, self._expire, (meeting_file, speculation))
+            speculation.timer.daemon = True
+            speculation.timer.start()
+            self._speculative[meeting_file] = speculation
+        if current is not None:
+            current.cancel()
+        print(f"[prefetch] speculative {label} summary started for {meeting_file}")
+
+    def _expire(self, meeting_file: str, speculation: Speculation) -> None:
+        with self._lock:
+            if self._speculative.get(meeting_file) is not speculation:
+                return
+            del self._speculative[meeting_file]
+        print(f"[prefetch] speculative {speculation.label} summary for {meeting_file} "
+              f"unclaimed after {SPECULATIVE_TIMEOUT:.0f}s, cancelling")
+        speculation.cancel()
+
+    def discard_speculative(self, meeting_file: str) -> None:
+        """A session left the meeting without choosing a style; cancel once no session is left"""
+        with self._lock:
+            speculation = self._speculative.get(meeting_file)
+            if speculation is None:
+                return
+            speculation.interested -= 1
+            if speculation.interested > 0:
+                return
+            del self._speculative[meeting_file]
+        print(f"[prefetch] discarding speculative {speculation.label} summary for {meeting_file}")
+        speculation.cancel()
+
+    def take_speculative(self, meeting_file: str, label: str) -> Optional[Flight]:
+        """Claim a speculative summary if it matches the chosen style; cancel it otherwise.
+
+        The returned flight carries the speculation's reader, so the caller
+        must stream() it (or detach()).
+        """
+        with self._lock:
+            speculation = self._speculative.pop(meeting_file, None)
+        if speculation is None:
+            return None
+        if speculation.label != label:
+            print(f"[prefetch] discarding speculative {speculation.label} summary for {meeting_file}")
+            speculation.cancel()
+            return None
+
+        speculation.timer.cancel()
+        if speculation.future.cancel():
+            # Not started yet, generating now is just as fast
+            return None
+        try:
+            flight = speculation.future.result()
+        except Exception:
+            return None
+        if flight.done and flight.error is not None:
+            flight.detach()
+            return None
+        # Somebody is waiting for it now
+        flight.ticket.scheduler.promote(flight.ticket, MODEL_ROUTES["summary"]["priority"])
+        return flight
+
+
+def extract_transcript(path: str) -> str:
+    """Extract the full text of a transcript PDF"""
+    return "".join(iter_pdf_pages(path)).strip()
+
+
+@st.cache_resource
+def get_prefetcher():
+    """Process-wide prefetcher shared by all sessions (cached)"""
+    return MeetingPrefetcher()
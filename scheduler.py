@@ -0,0 +1,123 @@
+import itertools
+import os
+import threading
+import streamlit as st
+from typing import List
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "summary": 1, "batch": 2}
+
+# Match Ollama's OLLAMA_NUM_PARALLEL so we never queue inside the backend
+PARALLEL_SLOTS = int(os.environ.get("OLLAMA_NUM_PARALLEL", "1"))
+
+# Waiting requests beyond this are rejected immediately
+MAX_QUEUE_DEPTH = int(os.environ.get("MEETING_MAX_QUEUE_DEPTH", "16"))
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the model queue is full (or a queued request was bumped out)"""
+
+
+class RequestCancelled(RuntimeError):
+    """Raised when a request is cancelled (e.g. nobody is waiting for it any more)"""
+
+
+class Ticket:
+    """A request's place in the model queue"""
+
+    def __init__(self, scheduler: "RequestScheduler", priority: int, seq: int):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.seq = seq
+        self.state = "waiting"  # waiting -> running -> done, or rejected
+
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+    def position(self) -> int:
+        """1-based position among waiting requests, 0 once running or finished"""
+        return self.scheduler.position(self)
+
+
+class RequestScheduler:
+    """Admission control and priority queue in front of the model backend.
+
+    At most ``slots`` requests run at once; waiting requests are admitted by
+    priority class (interactive chat, then summaries, then batch work) and
+    arrival order. When the queue is full a new request is rejected at once,
+    unless it outranks the lowest-priority waiting request, which is bumped
+    out instead.
+    """
+
+    def __init__(self, slots: int = PARALLEL_SLOTS, max_queue_depth: int = MAX_QUEUE_DEPTH):
+        self.slots = slots
+        self.max_queue_depth = max_queue_depth
+        self.running = 0
+        self._waiting: List[Ticket] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def enqueue(self, priority_class: str) -> Ticket:
+        """Take a place in the queue, or raise QueueFullError without waiting"""
+        priority = PRIORITIES[priority_class]
+        with self._cond:
+            ticket = Ticket(self, priority, next(self._seq))
+            if len(self._waiting) >= self.max_queue_depth:
+                lowest = max(self._waiting, key=Ticket.sort_key)
+                if lowest.priority <= priority:
+                    raise QueueFullError(
+                        f"Model queue is full ({len(self._waiting)} waiting), please retry shortly"
+                    )
+                self._waiting.remove(lowest)
+                lowest.state = "rejected"
+            self._waiting.append(ticket)
+            self._waiting.sort(key=Ticket.sort_key)
+            self._cond.notify_all()
+            return ticket
+
+    def wait(self, ticket: Ticket) -> None:
+        """Block until the ticket is admitted to a model slot"""
+        with self._cond:
+            while ticket.state == "waiting" and not (
+                self.running < self.slots and self._waiting[0] is ticket
+            ):
+                self._cond.wait()
+            if ticket.state == "rejected":
+                raise QueueFullError("Request was dropped from a full queue for higher-priority work")
+            if ticket.state == "done":
+                raise RequestCancelled("Request was cancelled while queued")
+            self._waiting.remove(ticket)
+            ticket.state = "running"
+            self.running += 1
+            self._cond.notify_all()
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot or place in the queue (safe to call more than once)"""
+        with self._cond:
+            if ticket.state == "running":
+                self.running -= 1
+            elif ticket in self._waiting:
+                self._waiting.remove(ticket)
+            ticket.state = "done"
+            self._cond.notify_all()
+
+    def promote(self, ticket: Ticket, priority_class: str) -> None:
+        """Raise a waiting ticket's priority (e.g. a user attached to batch work)"""
+        with self._cond:
+            priority = PRIORITIES[priority_class]
+            if ticket.state == "waiting" and priority < ticket.priority:
+                ticket.priority = priority
+                self._waiting.sort(key=Ticket.sort_key)
+                self._cond.notify_all()
+
+    def position(self, ticket: Ticket) -> int:
+        with self._cond:
+            if ticket.state != "waiting":
+                return 0
+            return self._waiting.index(ticket) + 1
+
+
+@st.cache_resource
+def get_scheduler():
+    """Scheduler shared by all Streamlit sessions in this process (cached)"""
+    return RequestScheduler()
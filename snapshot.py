@@ -0,0 +1,171 @@
+"""Export and import prebuilt index snapshots.
+
+A snapshot is a single zip file holding the chunk texts, metadata and
+embeddings of the meeting collection plus a manifest with the embedder
+version and a SHA-256 checksum for every member. Restoring one on a new
+node fills the vector database without recomputing any embeddings.
+
+Usage:
+    python snapshot.py export snapshots/meetings.zip
+    python snapshot.py import snapshots/meetings.zip
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
+import numpy as np
+from typing import Dict
+
+SNAPSHOT_FORMAT_VERSION = 1
+IMPORT_BATCH_SIZE = 1000
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is corrupt or incompatible with this node"""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _embedder_info(vector_db) -> Dict:
+    """Describe the embedding model so imports can refuse mismatches"""
+    import sentence_transformers
+    from vector_db import EMBEDDING_MODEL_NAME
+
+    return {
+        "model": EMBEDDING_MODEL_NAME,
+        "dimension": vector_db.embedding_model.get_sentence_embedding_dimension(),
+        "sentence_transformers": sentence_transformers.__version__,
+    }
+
+
+def export_snapshot(vector_db, path: str) -> Dict:
+    """Write the whole collection to a versioned, checksummed snapshot file"""
+    results = vector_db.collection.get(include=["documents", "metadatas", "embeddings"])
+    ids = results["ids"]
+    embeddings = np.asarray(results["embeddings"], dtype=np.float32)
+
+    chunks = io.StringIO()
+    meetings = {}
+    for chunk_id, document, metadata in zip(ids, results["documents"], results["metadatas"]):
+        chunks.write(json.dumps({"id": chunk_id, "document": document, "metadata": metadata},
+                                ensure_ascii=False) + "\n")
+        entry = meetings.setdefault(metadata["filename"],
+                                    {"file_hash": metadata.get("file_hash"), "chunks": 0})
+        entry["chunks"] += 1
+
+    embeddings_buffer = io.BytesIO()
+    np.save(embeddings_buffer, embeddings)
+
+    members = {
+        "chunks.jsonl": chunks.getvalue().encode("utf-8"),
+        "embeddings.npy": embeddings_buffer.getvalue(),
+    }
+    if os.path.exists(vector_db.dedupe.state_path):
+        with open(vector_db.dedupe.state_path, "rb") as f:
+            members["dedupe_state.json"] = f.read()
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "collection_name": vector_db.collection_name,
+        "embedder": _embedder_info(vector_db),
+        "count": len(ids),
+        "meetings": meetings,
+        "checksums": {name: _sha256(data) for name, data in members.items()},
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False))
+        for name, data in members.items():
+            zf.writestr(name, data)
+    os.replace(tmp_path, path)
+
+    print(f"Exported {len(ids)} chunks from {len(meetings)} meetings to {path}")
+    return manifest
+
+
+def read_snapshot(path: str, embedder: Dict):
+    """Read and validate a snapshot, returning its manifest, chunks and embeddings"""
+    with zipfile.ZipFile(path, "r") as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotError(
+                f"Unsupported snapshot format {manifest.get('format_version')}, "
+                f"expected {SNAPSHOT_FORMAT_VERSION}"
+            )
+
+        snapshot_embedder = manifest["embedder"]
+        if (snapshot_embedder["model"] != embedder["model"]
+                or snapshot_embedder["dimension"] != embedder["dimension"]):
+            raise SnapshotError(
+                f"Snapshot was built with {snapshot_embedder['model']} "
+                f"({snapshot_embedder['dimension']}d), this node uses "
+                f"{embedder['model']} ({embedder['dimension']}d)"
+            )
+
+        members = {}
+        for name, checksum in manifest["checksums"].items():
+            data = zf.read(name)
+            if _sha256(data) != checksum:
+                raise SnapshotError(f"Checksum mismatch for {name} in {path}")
+            members[name] = data
+
+    chunks = [json.loads(line) for line in members["chunks.jsonl"].decode("utf-8").splitlines()]
+    embeddings = np.load(io.BytesIO(members["embeddings.npy"]))
+    if len(chunks) != len(embeddings) or len(chunks) != manifest["count"]:
+        raise SnapshotError(f"Snapshot {path} is inconsistent: chunk and embedding counts differ")
+
+    return manifest, chunks, embeddings, members.get("dedupe_state.json")
+
+
+def import_snapshot(vector_db, path: str) -> Dict:
+    """Restore a snapshot into the vector database without re-embedding"""
+    manifest, chunks, embeddings, dedupe_state = read_snapshot(path, _embedder_info(vector_db))
+
+    for start in range(0, len(chunks), IMPORT_BATCH_SIZE):
+        batch = chunks[start:start + IMPORT_BATCH_SIZE]
+        vector_db.collection.upsert(
+            ids=[chunk["id"] for chunk in batch],
+            documents=[chunk["document"] for chunk in batch],
+            metadatas=[chunk["metadata"] for chunk in batch],
+            embeddings=embeddings[start:start + IMPORT_BATCH_SIZE].tolist(),
+        )
+
+    if dedupe_state is not None:
+        # Merge rather than replace, so meetings already ingested here keep their state
+        vector_db.dedupe.merge_state(json.loads(dedupe_state))
+        vector_db.dedupe.save()
+
+    if vector_db.exact_index is not None:
+        for filename in set(manifest["meetings"]) | set(vector_db.dedupe.meetings):
+            vector_db.sync_exact_meeting(filename)
+
+    print(f"Imported {len(chunks)} chunks from {len(manifest['meetings'])} meetings from {path}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import meeting index snapshots")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot file")
+    args = parser.parse_args()
+
+    from vector_db import MeetingVectorDB, VECTOR_BACKEND, EXACT_INDEX_DTYPE
+
+    vector_db = MeetingVectorDB(backend=VECTOR_BACKEND, exact_dtype=EXACT_INDEX_DTYPE)
+    if args.command == "export":
+        export_snapshot(vector_db, args.path)
+    else:
+        import_snapshot(vector_db, args.path)
+
+
+if __name__ == "__main__":
+    main()
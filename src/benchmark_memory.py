@@ -0,0 +1,162 @@
+"""Peak memory of ingesting one very long transcript.
+
+Generates synthetic transcripts of growing length from the pages in
+data/Meetings and measures each mode in its own subprocess. A stub embedder
+returns random vectors of the real dimension, so the numbers leave out the
+embedding model.
+
+Pipeline modes store nothing, so they show whether the ingest path itself
+stays flat:
+  whole      previous path: full text, all chunks and all embeddings in memory
+  streaming  pages -> chunks -> embedding batches -> digest, one batch at a time
+
+The ingest line runs MeetingVectorDB.add_meeting_to_db into a fresh temporary
+database. On top of the streaming pipeline it grows with the number of
+chunks: the vector store itself, the dedupe signatures (about 1 KB per chunk)
+and, with --backend exact, the meeting's rows and documents, which that index
+keeps in memory.
+
+Usage: python src/benchmark_memory.py [--pages 100 1000 5000] [--backend chroma|exact]
+"""
+import argparse
+import glob
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from digest import DigestBuilder, build_digest
+from transcript_stream import EMBED_BATCH_SIZE, batched, iter_chunks, iter_pdf_pages
+
+EMBEDDING_DIMENSION = 384
+
+
+class StubEmbedder:
+    """Random unit vectors with the SentenceTransformer encode interface"""
+
+    def __init__(self):
+        self.rng = np.random.default_rng(0)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return EMBEDDING_DIMENSION
+
+    def encode(self, texts, normalize_embeddings: bool = True) -> np.ndarray:
+        embeddings = self.rng.normal(size=(len(texts), EMBEDDING_DIMENSION)).astype(np.float32)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def make_transcript(path: str, pages: int, source_dir: str = "data/Meetings") -> None:
+    """Write a PDF of ``pages`` pages built from the real transcript pages.
+
+    Words are shuffled within each line so repeated source pages don't turn
+    into near-duplicate chunks, which dedupe would store only once.
+    """
+    source_pages = [text for pdf in sorted(glob.glob(os.path.join(source_dir, "*.pdf")))
+                    for text in iter_pdf_pages(pdf) if text.strip()]
+    rng = random.Random(0)
+    doc = fitz.open()
+    for i in range(pages):
+        lines = []
+        for line in source_pages[i % len(source_pages)].splitlines():
+            words = line.split()
+            rng.shuffle(words)
+            lines.append(" ".join(words))
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (40, 40, -40, -40), "\n".join(lines), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_whole(path: str) -> int:
+    """Previous pipeline: whole text, all chunks and all embeddings in memory"""
+    text = "".join(iter_pdf_pages(path)).strip()
+    chunks = list(iter_chunks([text]))
+    embeddings = StubEmbedder().encode(chunks)
+    build_digest(chunks, embeddings)
+    return len(chunks)
+
+
+def run_streaming(path: str) -> int:
+    """Streaming pipeline with a no-op store: nothing kept beyond one batch and the digest"""
+    embedder = StubEmbedder()
+    builder = DigestBuilder()
+    count = 0
+    for batch in batched(iter_chunks(iter_pdf_pages(path)), EMBED_BATCH_SIZE):
+        for chunk, embedding in zip(batch, embedder.encode(batch)):
+            builder.add_chunk(chunk, embedding)
+        count += len(batch)
+    builder.finish()
+    return count
+
+
+def run_ingest(path: str, backend: str) -> int:
+    """Full add_meeting_to_db into a fresh temporary database"""
+    from vector_db import MeetingVectorDB
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MeetingVectorDB(os.path.join(tmp, "chroma_db"), backend=backend,
+                             exact_index_directory=os.path.join(tmp, "exact_index"))
+        db.embedding_model = StubEmbedder()
+        if not db.add_meeting_to_db(path):
+            raise RuntimeError(f"Ingest of {path} failed")
+        return db.dedupe.meetings[os.path.basename(path)]["chunks_seen"]
+
+
+def measure(mode: str, backend: str, path: str) -> None:
+    """Child process: run one mode and print chunks, seconds, baseline and peak RSS in MB"""
+    if mode == "ingest":
+        import vector_db  # noqa: F401  (count the import as startup, not ingest)
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "ingest":
+        chunks = run_ingest(path, backend)
+    else:
+        chunks = {"whole": run_whole, "streaming": run_streaming}[mode](path)
+    elapsed = time.perf_counter() - start
+
+    print(chunks, f"{elapsed:.2f}", f"{baseline:.1f}", f"{peak_rss_mb():.1f}")
+
+
+def run_mode(mode: str, backend: str, path: str) -> tuple:
+    """Measure one mode in a fresh subprocess, returning the chunk count and a result line"""
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", mode, backend, path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    chunks, elapsed, baseline, peak = output.strip().splitlines()[-1].split()
+    return chunks, f"{mode} +{float(peak) - float(baseline):.1f} MB / {elapsed}s"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3], sys.argv[4])
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--backend", default="chroma", choices=["chroma", "exact"])
+    args = parser.parse_args()
+
+    print("Peak RSS over startup per mode")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"transcript_{pages}.pdf")
+            make_transcript(path, pages)
+            chunks, whole = run_mode("whole", args.backend, path)
+            _, streaming = run_mode("streaming", args.backend, path)
+            _, ingest = run_mode("ingest", args.backend, path)
+            print(f"{pages} pages, {chunks} chunks: {whole}, {streaming}")
+            print(f"{pages} pages, {chunks} chunks: {ingest} ({args.backend})")
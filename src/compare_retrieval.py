@@ -0,0 +1,38 @@
+"""Compare recall and latency of Chroma retrieval against exact memory-mapped search.
+
+Usage: python src/compare_retrieval.py [meeting.pdf] [--dtype float16|int8]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vector_db import MeetingVectorDB
+
+SAMPLE_QUERIES = [
+    "Welche Aufgaben wurden verteilt?",
+    "Wann ist das nächste Projekttreffen?",
+    "Was wurde zum Konsortialvertrag besprochen?",
+    "Which deadlines were mentioned?",
+    "Who is responsible for the project plan?",
+]
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("meeting", nargs="?", help="Meeting filename, defaults to all indexed meetings")
+parser.add_argument("--dtype", default="float16", choices=["float16", "int8"])
+parser.add_argument("--top-k", type=int, default=5)
+args = parser.parse_args()
+
+# A separate exact index per dtype, so it never clashes with the app's ./exact_index
+db = MeetingVectorDB(backend="exact", exact_dtype=args.dtype,
+                     exact_index_directory=f"./exact_index_compare_{args.dtype}")
+db.process_all_meetings()
+
+meetings = [args.meeting] if args.meeting else sorted(db.get_all_filenames())
+for meeting in meetings:
+    stats = db.compare_backends(SAMPLE_QUERIES, meeting, top_k=args.top_k)
+    print(
+        f"{meeting}: recall@{args.top_k}={stats['recall_at_k']:.2f} "
+        f"chroma={stats['chroma_ms']:.1f}ms exact={stats['exact_ms']:.1f}ms"
+    )
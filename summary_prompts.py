@@ -0,0 +1,123 @@
+# Dictionary of button labels and their corresponding prompts
+# Note: Summaries use full transcript for completeness, but chat uses vector retrieval for efficiency
+SUMMARIZATION_OPTIONS = {
+    "📝 Cornell Notes": """
+You are a meeting assistant. Create a Cornell Notes summary immediately.
+
+STRICT INSTRUCTIONS:
+- Do NOT comment on text length or complexity
+- Do NOT use phrases like "I'm sorry", "appears to", "seems like"
+- Start IMMEDIATELY with the Cornell Notes format
+- Use ONLY information from the transcript
+
+FORMAT (follow exactly):
+PARTICIPANTS:
+• [List each person and their role]
+
+NOTES:
+• [Key discussion points]
+• [Important decisions made]
+• [Technical details discussed]
+
+CUES:
+• [Main topics/keywords]
+• [Action items]
+• [Deadlines mentioned]
+
+SUMMARY:
+[2-3 sentences covering the main outcomes and next steps]
+
+LANGUAGE: Always respond in the language of the transcript.
+
+TRANSCRIPT:
+{transcript_text}
+""",
+    
+    "📝 1 to 1 Meeting": """
+You are an expert in meeting notes. I am having a 1:1 meeting with someone in my team, please capture these meeting notes in a concise and actionable format. Focus on immediate priorities, progress, challenges, and personal feedback, ensuring the notes are structured for clarity, efficiency and easy follow-up. Please highlight key phrases and organize content hierarchically in the generated notes.
+
+RULES:
+- No preamble or explanatory text
+- Start directly with the meeting content
+- Focus on actionable items and feedback
+- Organize hierarchically with clear structure
+- Highlight key phrases
+
+LANGUAGE: Always respond in the language of the transcript.
+
+TRANSCRIPT:
+{transcript_text}
+""",
+    
+    "📋 Meeting Summary": """
+Summarize given text into a well-formed meeting summary, and present the results using markdown format. Please highlight key phrases in the generated notes. Do not show results that cannot be generated.
+
+RULES:
+- Use markdown format for structure
+- Highlight key phrases
+- Present clear, well-formed summary
+- Only include content that can be generated from the transcript
+
+LANGUAGE: Always respond in the language of the transcript.
+
+TRANSCRIPT:
+{transcript_text}
+""",
+    
+    "🧠 Feynman Tech": """
+Turn the given text into a detailed study note using Feynman Technique to help the user to achieve a deep and intuitive understanding of the topic. The output should include a clear, simplified explanation of the topic, identification, and resolution of knowledge gaps, and a refined explanation that is ready for teaching. Each step should be documented thoroughly to ensure a comprehensive understanding. Please highlight key phrases and organize content hierarchically in the generated notes.
+
+RULES:
+- Apply Feynman Technique methodology
+- Create detailed study notes for deep understanding
+- Include simplified explanations and knowledge gap resolution
+- Document each step thoroughly
+- Highlight key phrases and organize hierarchically
+
+LANGUAGE: Always respond in the language of the transcript.
+
+TRANSCRIPT:
+{transcript_text}
+""",
+    
+    "� Project Sync": """
+You are an expert in meeting notes. I participated in our project sync to get a clear picture of where we stand and what's coming up. My focus was on understanding our progress, identifying any hurdles, and ensuring we're all aligned on our next moves to keep things on track. Please highlight key phrases and organize content hierarchically in the generated notes.
+
+RULES:
+- Focus on project progress and alignment
+- Identify hurdles and next steps
+- Organize hierarchically with clear structure
+- Highlight key phrases for easy reference
+
+LANGUAGE: Always respond in the language of the transcript.
+
+TRANSCRIPT:
+{transcript_text}
+""",
+    
+    "� Brainstorming": """
+Summarize given text into a well-formed Brainstorm Notes, and present the results as follows use markdown format:
+## Ideas 1
+#### Key Concepts
+#### Pros & Cons
+#### Examples
+## Ideas ...
+#### Key Concepts
+#### Pros & Cons
+#### Examples
+## Exploration
+Please highlight key phrases and organize content hierarchically in the generated notes. Do not show results that cannot be generated.
+
+RULES:
+- Use the specified markdown format structure
+- Organize ideas with key concepts, pros & cons, and examples
+- Include exploration section
+- Highlight key phrases
+- Only show results that can be generated
+
+LANGUAGE: Always respond in the language of the transcript.
+
+TRANSCRIPT:
+{transcript_text}
+"""
+}
@@ -0,0 +1,69 @@
+import itertools
+import fitz  # PyMuPDF
+from typing import Iterable, Iterator, List
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = 32
+
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[str]:
+    """Yield the text of a PDF one page at a time"""
+    doc = fitz.open(pdf_path)
+    try:
+        for page in doc:
+            yield page.get_text()
+    finally:
+        doc.close()
+
+
+def page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def read_page(pdf_path: str, page_number: int) -> str:
+    """Text of a single page (0-based)"""
+    with fitz.open(pdf_path) as doc:
+        return doc[page_number].get_text()
+
+
+def iter_chunks(pages: Iterable[str], chunk_size: int = CHUNK_SIZE,
+                overlap: int = CHUNK_OVERLAP) -> Iterator[str]:
+    """Split streamed text into overlapping chunks ending at sentence boundaries.
+
+    Only the text not yet emitted is buffered, so memory stays around one
+    chunk plus one page regardless of document length.
+    """
+    buffer = ""
+    for page in pages:
+        buffer = (buffer + page) if buffer else page.lstrip()
+
+        # A chunk is final once text beyond its end has arrived
+        while len(buffer) > chunk_size:
+            end = chunk_size
+            sentence_end = max(buffer.rfind('.', 0, end),
+                               buffer.rfind('!', 0, end),
+                               buffer.rfind('?', 0, end))
+            if sentence_end > 0:
+                end = sentence_end + 1
+
+            chunk = buffer[:end].strip()
+            if chunk:
+                yield chunk
+
+            buffer = buffer[end - overlap if end > overlap else end:]
+
+    tail = buffer.strip()
+    if tail:
+        yield tail
+
+
+def batched(items: Iterable, size: int = EMBED_BATCH_SIZE) -> Iterator[List]:
+    """Group an iterable into lists of at most ``size`` items"""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
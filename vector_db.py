@@ -1,20 +1,54 @@
 import chromadb
 import os
-import fitz  # PyMuPDF
-from sentence_transformers import SentenceTransformer
 import streamlit as st
 from typing import List, Dict, Tuple
 import hashlib
+import time
+import zipfile
+import numpy as np
+from exact_search import MemmapEmbeddingIndex
+from dedupe import MinHashDeduplicator
+from digest import DIGEST_VERSION, DigestBuilder, build_digest, load_digests, save_digests
+from embedding_service import get_embedder
+from transcript_stream import (CHUNK_OVERLAP, CHUNK_SIZE, EMBED_BATCH_SIZE,
+                               batched, iter_chunks, iter_pdf_pages)
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Retrieval backend: "chroma" (HNSW + metadata filter) or "exact"
+# (memory-mapped NumPy dot product per meeting)
+VECTOR_BACKEND = os.environ.get("MEETING_VECTOR_BACKEND", "chroma")
+EXACT_INDEX_DTYPE = os.environ.get("MEETING_EXACT_INDEX_DTYPE", "float16")
+
+# Prebuilt index restored on startup when the local database is empty
+INDEX_SNAPSHOT_PATH = os.environ.get("MEETING_INDEX_SNAPSHOT", "snapshots/meetings.zip")
 
 class MeetingVectorDB:
-    def __init__(self, persist_directory="./chroma_db"):
+    def __init__(self, persist_directory="./chroma_db", backend="chroma",
+                 exact_index_directory="./exact_index", exact_dtype="float16"):
         """Initialize ChromaDB client and collection"""
         self.persist_directory = persist_directory
         self.client = chromadb.PersistentClient(path=persist_directory)
         self.collection_name = "meeting_transcripts"
+        self.backend = backend
         
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize embedding model (shared embedding service if running, else in-process).
+        # Chunks and queries are always embedded here, so Chroma's own embedder never loads.
+        self.embedding_model = get_embedder(EMBEDDING_MODEL_NAME)
+
+        # Optional exact-search index kept alongside the Chroma collection
+        self.exact_index = None
+        if backend == "exact":
+            self.exact_index = MemmapEmbeddingIndex(exact_index_directory, exact_dtype)
+        elif backend != "chroma":
+            raise ValueError(f"Unknown vector backend: {backend}")
+
+        # Near-duplicate detection state (MinHash signatures + back-references)
+        self.dedupe = MinHashDeduplicator(os.path.join(persist_directory, "dedupe_state.json"))
+
+        # Extractive per-meeting digests (keywords, preview, participants)
+        self.digests_path = os.path.join(persist_directory, "digests.json")
+        self.digests = load_digests(self.digests_path)
         
         # Get or create collection
         try:
@@ -28,44 +62,14 @@ class MeetingVectorDB:
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            doc = fitz.open(pdf_path)
-            full_text = ""
-            for page in doc:
-                full_text += page.get_text()
-            doc.close()
-            return full_text.strip()
+            return "".join(iter_pdf_pages(pdf_path)).strip()
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return ""
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    def chunk_text(self, text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
         """Split text into overlapping chunks"""
-        if len(text) <= chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            
-            # Find the last sentence boundary within the chunk
-            if end < len(text):
-                last_period = text.rfind('.', start, end)
-                last_exclamation = text.rfind('!', start, end)
-                last_question = text.rfind('?', start, end)
-                
-                sentence_end = max(last_period, last_exclamation, last_question)
-                if sentence_end > start:
-                    end = sentence_end + 1
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            start = end - overlap
-            
-        return chunks
+        return list(iter_chunks([text], chunk_size, overlap))
     
     def get_file_hash(self, file_path: str) -> str:
         """Get hash of file for checking if it's already processed"""
@@ -79,65 +83,194 @@ class MeetingVectorDB:
         """Check if file is already in the database"""
         filename = os.path.basename(file_path)
         file_hash = self.get_file_hash(file_path)
+        if self.dedupe.file_hash(filename) != file_hash and not self._is_in_collection(file_path):
+            return False
+        if self.exact_index is not None:
+            return self.exact_index.has_meeting(filename, file_hash)
+        return True
+
+    def _is_in_collection(self, file_path: str) -> bool:
+        """Check if file is already in the Chroma collection"""
+        filename = os.path.basename(file_path)
+        file_hash = self.get_file_hash(file_path)
         
         try:
             results = self.collection.get(
-                where={"filename": filename, "file_hash": file_hash},
+                where={"$and": [{"filename": filename}, {"file_hash": file_hash}]},
                 limit=1
             )
             return len(results['ids']) > 0
         except:
             return False
     
+    def embed(self, texts: List[str]):
+        """Embed texts with the shared sentence-transformer model"""
+        return self.embedding_model.encode(texts, normalize_embeddings=True)
+    
     def add_meeting_to_db(self, file_path: str) -> bool:
         """Add a meeting PDF to the vector database"""
         if self.is_file_processed(file_path):
             print(f"File {file_path} already processed. Skipping.")
             return True
         
+        filename = os.path.basename(file_path)
+        file_hash = self.get_file_hash(file_path)
+        # Writes to undo if the ingest fails before the dedupe state is saved
+        own_ids, added_ids, flagged_ids = set(), [], []
+        exact_added = digest_added = False
         try:
-            # Extract text
-            text = self.extract_text_from_pdf(file_path)
-            if not text:
+            if self._is_in_collection(file_path):
+                # Chunks are already stored (e.g. after switching to the exact
+                # backend): rebuild the exact rows instead of re-chunking
+                if self.exact_index is not None:
+                    self.sync_exact_meeting(filename)
+                self.ensure_digests()
+                print(f"Rebuilt index rows for {filename} from the vector database")
+                return True
+            
+            previous_ids = self._previous_chunk_ids(filename)
+            shared_ids = []
+            digest = DigestBuilder()
+            # The exact index is written per meeting, so only it keeps all rows
+            exact_ids, exact_documents, exact_embeddings = [], [], []
+            chunk_count = stored_count = 0
+            
+            # Stream pages -> chunks -> embedding batches, so memory stays
+            # bounded by one batch regardless of transcript length
+            for batch in batched(iter_chunks(iter_pdf_pages(file_path)), EMBED_BATCH_SIZE):
+                ids = []
+                documents = []
+                metadatas = []
+                # Every chunk in order, with its row in ``documents`` or its canonical chunk id
+                digest_entries = []
+                
+                for chunk in batch:
+                    i = chunk_count
+                    chunk_count += 1
+                    chunk_id = f"{filename}_{file_hash}_{i}"
+                    
+                    # Store near-duplicates only once, as a back-reference
+                    signature = self.dedupe.signature(chunk)
+                    canonical_id = self.dedupe.find_duplicate(signature, exclude=previous_ids)
+                    if canonical_id is not None:
+                        self.dedupe.add_reference(canonical_id, filename, i)
+                        if canonical_id not in own_ids and canonical_id not in shared_ids:
+                            shared_ids.append(canonical_id)
+                        digest_entries.append((chunk, canonical_id))
+                        continue
+                    
+                    self.dedupe.add_canonical(chunk_id, signature)
+                    own_ids.add(chunk_id)
+                    digest_entries.append((chunk, len(documents)))
+                    ids.append(chunk_id)
+                    documents.append(chunk)
+                    metadatas.append({
+                        "filename": filename,
+                        "file_hash": file_hash,
+                        "chunk_index": i,
+                        "file_path": file_path
+                    })
+                
+                if documents:
+                    # Embed once and reuse for every store
+                    embeddings = self.embed(documents)
+                    
+                    self.collection.add(
+                        documents=documents,
+                        embeddings=embeddings.tolist(),
+                        ids=ids,
+                        metadatas=metadatas
+                    )
+                    added_ids += ids
+                    stored_count += len(ids)
+                    
+                    if self.exact_index is not None:
+                        exact_ids += ids
+                        exact_documents += documents
+                        exact_embeddings.append(embeddings)
+                
+                # The digest sees every chunk; near-duplicates reuse the
+                # canonical chunk's stored embedding
+                canonical_ids = list({source for _, source in digest_entries if isinstance(source, str)})
+                canonical = {}
+                if canonical_ids:
+                    stored = self.collection.get(ids=canonical_ids, include=["embeddings"])
+                    canonical = dict(zip(stored['ids'], stored['embeddings']))
+                for chunk, source in digest_entries:
+                    digest.add_chunk(chunk, embeddings[source] if isinstance(source, int) else canonical.get(source))
+            
+            if chunk_count == 0:
                 print(f"No text extracted from {file_path}")
                 return False
             
-            # Chunk text
-            chunks = self.chunk_text(text)
-            
-            # Prepare data for ChromaDB
-            filename = os.path.basename(file_path)
-            file_hash = self.get_file_hash(file_path)
+            # Flag chunks from other meetings that this meeting also contains
+            if shared_ids:
+                flagged_ids = shared_ids
+                self.collection.update(
+                    ids=shared_ids,
+                    metadatas=[{f"also_in:{filename}": True} for _ in shared_ids]
+                )
             
-            ids = []
-            documents = []
-            metadatas = []
+            if self.exact_index is not None:
+                exact_added = True
+                self.exact_index.add_meeting(
+                    filename, file_hash, exact_ids, exact_documents,
+                    np.concatenate(exact_embeddings) if exact_embeddings
+                    else np.empty((0, self.embedding_dimension())),
+                    shared_ids=shared_ids
+                )
             
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{filename}_{file_hash}_{i}"
-                ids.append(chunk_id)
-                documents.append(chunk)
-                metadatas.append({
-                    "filename": filename,
-                    "file_hash": file_hash,
-                    "chunk_index": i,
-                    "file_path": file_path
-                })
+            digest_added = True
+            self.digests[filename] = digest.finish()
+            save_digests(self.digests_path, self.digests)
             
-            # Add to collection
-            self.collection.add(
-                documents=documents,
-                ids=ids,
-                metadatas=metadatas
-            )
+            # Saving the dedupe state records the meeting as ingested, so it goes last
+            self.dedupe.record_ingest(filename, file_hash, chunk_count, stored_count)
+            self.dedupe.save()
             
-            print(f"Added {len(chunks)} chunks from {filename} to vector database")
+            print(f"Added {stored_count} chunks from {filename} to vector database "
+                  f"({chunk_count - stored_count} near-duplicates stored as references)")
             return True
             
         except Exception as e:
             print(f"Error adding {file_path} to database: {e}")
+            # Discard unsaved signatures and everything already written for this meeting
+            self.dedupe = MinHashDeduplicator(self.dedupe.state_path)
+            try:
+                if added_ids:
+                    self.collection.delete(ids=added_ids)
+                if flagged_ids:
+                    self.collection.update(
+                        ids=flagged_ids,
+                        metadatas=[{f"also_in:{filename}": None} for _ in flagged_ids]
+                    )
+                if exact_added:
+                    self.exact_index.delete_meeting(filename)
+                if digest_added and self.digests.pop(filename, None) is not None:
+                    save_digests(self.digests_path, self.digests)
+            except Exception as rollback_error:
+                print(f"Could not fully roll back {file_path}: {rollback_error}")
             return False
     
+    def _previous_chunk_ids(self, filename: str) -> set:
+        """Signatures left from an earlier ingest of this meeting.
+
+        These must not be mistaken for duplicates from other meetings: chunks
+        it still owns in Chroma, and chunks with its id prefix that are no
+        longer stored at all. Chunks handed to another meeting on delete keep
+        their id but are excluded here.
+        """
+        owned = set(self.collection.get(where={"filename": filename}, include=[])['ids'])
+        prefixed = [chunk_id for chunk_id in self.dedupe.chunk_ids()
+                    if chunk_id.rsplit("_", 2)[0] == filename and chunk_id not in owned]
+        if not prefixed:
+            return owned
+        stored = set(self.collection.get(ids=prefixed, include=[])['ids'])
+        return owned | {chunk_id for chunk_id in prefixed if chunk_id not in stored}
+    
+    def embedding_dimension(self) -> int:
+        return self.embedding_model.get_sentence_embedding_dimension()
+    
     def process_all_meetings(self, meetings_dir: str = "data/Meetings") -> Dict[str, bool]:
         """Process all PDF files in the meetings directory"""
         results = {}
@@ -153,16 +286,25 @@ class MeetingVectorDB:
             success = self.add_meeting_to_db(file_path)
             results[pdf_file] = success
         
+        stats = self.dedupe.get_stats()
+        print(f"Dedupe: stored {stats['chunks_stored']}/{stats['chunks_seen']} chunks, "
+              f"index {stats['shrink_ratio']:.1%} smaller")
         return results
     
     def query_meeting(self, query: str, filename: str, top_k: int = 5) -> List[str]:
         """Query the vector database for relevant chunks from a specific meeting"""
+        if self.backend == "exact":
+            return self.query_meeting_exact(query, filename, top_k)
+        return self.query_meeting_chroma(query, filename, top_k)
+    
+    def query_meeting_chroma(self, query: str, filename: str, top_k: int = 5) -> List[str]:
+        """Query the Chroma collection (HNSW + metadata filter)"""
         try:
             # Query the collection
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=self.embed([query]).tolist(),
                 n_results=top_k,
-                where={"filename": filename}
+                where=self._meeting_filter(filename)
             )
             
             if results['documents'] and len(results['documents'][0]) > 0:
@@ -174,11 +316,62 @@ class MeetingVectorDB:
             print(f"Error querying database: {e}")
             return []
     
+    def _meeting_filter(self, filename: str) -> Dict:
+        """Chroma filter for a meeting's own chunks and deduplicated shared ones"""
+        return {"$or": [{"filename": filename}, {f"also_in:{filename}": True}]}
+    
+    def query_meeting_exact(self, query: str, filename: str, top_k: int = 5) -> List[str]:
+        """Query the memory-mapped exact index (NumPy dot product over one meeting)"""
+        try:
+            hits = self.exact_index.query(self.embed([query])[0], filename, top_k)
+            return [hit["document"] for hit in hits]
+        except Exception as e:
+            print(f"Error querying exact index: {e}")
+            return []
+    
+    def compare_backends(self, queries: List[str], filename: str, top_k: int = 5) -> Dict[str, float]:
+        """Compare recall and latency of the Chroma path against exact search.
+
+        Exact search is the ground truth, so recall is the fraction of exact
+        top-k chunks that Chroma also returns.
+        """
+        if self.exact_index is None:
+            raise ValueError("compare_backends requires the 'exact' backend")
+
+        chroma_times, exact_times, recalls = [], [], []
+        for query in queries:
+            start = time.perf_counter()
+            chroma_hits = self.query_meeting_chroma(query, filename, top_k)
+            chroma_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            exact_hits = self.query_meeting_exact(query, filename, top_k)
+            exact_times.append(time.perf_counter() - start)
+
+            if exact_hits:
+                recalls.append(len(set(chroma_hits) & set(exact_hits)) / len(exact_hits))
+
+        return {
+            "queries": len(queries),
+            "recall_at_k": sum(recalls) / len(recalls) if recalls else 0.0,
+            "chroma_ms": 1000 * sum(chroma_times) / max(len(queries), 1),
+            "exact_ms": 1000 * sum(exact_times) / max(len(queries), 1),
+        }
+    
+    def warm_meeting(self, filename: str) -> None:
+        """Load the embedding model and a meeting's index pages ahead of the first question"""
+        try:
+            self.query_meeting(filename, filename, top_k=1)
+        except Exception as e:
+            print(f"Error warming index for {filename}: {e}")
+    
     def get_all_filenames(self) -> List[str]:
         """Get all unique filenames in the database"""
+        if self.exact_index is not None:
+            return self.exact_index.get_all_filenames()
         try:
             results = self.collection.get()
-            filenames = set()
+            filenames = set(self.dedupe.meetings)
             for metadata in results['metadatas']:
                 filenames.add(metadata['filename'])
             return list(filenames)
@@ -193,9 +386,51 @@ class MeetingVectorDB:
                 where={"filename": filename}
             )
             
+            # Drop this meeting's back-references on chunks owned by other meetings
+            # (Chroma merges metadata on update; a None value removes the key)
+            referenced = self.dedupe.remove_references(filename)
+            if referenced:
+                self.collection.update(
+                    ids=referenced,
+                    metadatas=[{f"also_in:{filename}": None} for _ in referenced]
+                )
+            
+            # Hand chunks still referenced by other meetings over to one of them
+            delete_ids = []
+            affected = set()
+            for chunk_id, metadata in zip(results['ids'], results['metadatas']):
+                refs = self.dedupe.references.get(chunk_id, [])
+                if not refs:
+                    self.dedupe.remove_canonical(chunk_id)
+                    delete_ids.append(chunk_id)
+                    continue
+                
+                new_owner = refs.pop(0)
+                self.collection.update(ids=[chunk_id], metadatas=[{
+                    "filename": new_owner["filename"],
+                    "chunk_index": new_owner["chunk_index"],
+                    "file_hash": self.dedupe.file_hash(new_owner["filename"]) or "",
+                    "file_path": os.path.join(os.path.dirname(metadata["file_path"]), new_owner["filename"]),
+                    f"also_in:{new_owner['filename']}": None,
+                }])
+                self.dedupe.transfer_chunk(filename, new_owner["filename"])
+                affected.add(new_owner["filename"])
+            
+            self.dedupe.meetings.pop(filename, None)
+            self.dedupe.save()
+            
+            if self.digests.pop(filename, None) is not None:
+                save_digests(self.digests_path, self.digests)
+            
+            if self.exact_index is not None:
+                self.exact_index.delete_meeting(filename)
+                for other in affected:
+                    self.sync_exact_meeting(other)
+            
+            if delete_ids:
+                self.collection.delete(ids=delete_ids)
+                print(f"Deleted {len(delete_ids)} chunks for {filename}")
             if results['ids']:
-                self.collection.delete(ids=results['ids'])
-                print(f"Deleted {len(results['ids'])} chunks for {filename}")
                 return True
             else:
                 print(f"No chunks found for {filename}")
@@ -204,17 +439,81 @@ class MeetingVectorDB:
         except Exception as e:
             print(f"Error deleting {filename}: {e}")
             return False
+    
+    def _stored_chunks(self, filename: str) -> Tuple[Dict, List[int], np.ndarray]:
+        """A meeting's own chunks from Chroma, their chunk order and embeddings"""
+        owned = self.collection.get(where={"filename": filename},
+                                    include=["documents", "metadatas", "embeddings"])
+        order = sorted(range(len(owned['ids'])), key=lambda i: owned['metadatas'][i]["chunk_index"])
+        embeddings = np.asarray(owned['embeddings'], dtype=np.float32).reshape(-1, self.embedding_dimension())
+        return owned, order, embeddings[order]
+    
+    def sync_exact_meeting(self, filename: str) -> None:
+        """Rebuild one meeting's exact-index rows from the Chroma collection"""
+        owned, order, embeddings = self._stored_chunks(filename)
+        shared = self.collection.get(where={f"also_in:{filename}": True}, include=[])
+        
+        file_hash = self.dedupe.file_hash(filename)
+        if not file_hash and owned['ids']:
+            file_hash = owned['metadatas'][0]["file_hash"]
+        
+        self.exact_index.add_meeting(
+            filename,
+            file_hash or "",
+            [owned['ids'][i] for i in order],
+            [owned['documents'][i] for i in order],
+            embeddings,
+            shared_ids=shared['ids']
+        )
+    
+    def _digest_chunks(self, filename: str) -> Tuple[List[str], np.ndarray]:
+        """All of a meeting's chunks in order, including those stored under other meetings"""
+        owned, order, embeddings = self._stored_chunks(filename)
+        entries = [(owned['metadatas'][i]["chunk_index"], owned['documents'][i], embedding)
+                   for i, embedding in zip(order, embeddings)]
+        
+        shared = self.collection.get(where={f"also_in:{filename}": True},
+                                     include=["documents", "embeddings"])
+        for chunk_id, document, embedding in zip(shared['ids'], shared['documents'], shared['embeddings']):
+            for ref in self.dedupe.references.get(chunk_id, []):
+                if ref["filename"] == filename:
+                    entries.append((ref["chunk_index"], document, np.asarray(embedding, dtype=np.float32)))
+        
+        entries.sort(key=lambda entry: entry[0])
+        return ([document for _, document, _ in entries],
+                np.asarray([embedding for _, _, embedding in entries], dtype=np.float32))
+    
+    def ensure_digests(self) -> int:
+        """Build missing or outdated digests from stored chunks and embeddings (no re-embedding)"""
+        missing = [f for f in self.get_all_filenames()
+                   if self.digests.get(f, {}).get("version") != DIGEST_VERSION]
+        for filename in missing:
+            self.digests[filename] = build_digest(*self._digest_chunks(filename))
+        if missing:
+            save_digests(self.digests_path, self.digests)
+        return len(missing)
 
 @st.cache_resource
 def get_vector_db():
     """Get or create the vector database instance (cached)"""
-    return MeetingVectorDB()
+    return MeetingVectorDB(backend=VECTOR_BACKEND, exact_dtype=EXACT_INDEX_DTYPE)
 
 def initialize_vector_db_if_needed():
     """Initialize vector database and process meetings if needed"""
     try:
         vector_db = get_vector_db()
         
+        # Restore a prebuilt snapshot instead of re-embedding on a fresh node
+        if os.path.exists(INDEX_SNAPSHOT_PATH) and not vector_db.get_all_filenames():
+            from snapshot import SnapshotError, import_snapshot
+            try:
+                with st.spinner("Restoring meeting index snapshot..."):
+                    import_snapshot(vector_db, INDEX_SNAPSHOT_PATH)
+            except (SnapshotError, zipfile.BadZipFile, KeyError, ValueError) as e:
+                # Fall back to indexing the PDFs below
+                print(f"Snapshot {INDEX_SNAPSHOT_PATH} not restored: {e}")
+                st.warning(f"⚠️ Index snapshot could not be restored ({e}), indexing meetings instead")
+        
         # Check if we need to process any meetings
         meetings_dir = "data/Meetings"
         if os.path.exists(meetings_dir):
@@ -230,6 +529,9 @@ def initialize_vector_db_if_needed():
                     success_count = sum(1 for success in results.values() if success)
                     st.success(f"✅ Processed {success_count}/{len(files_to_process)} meeting files")
             
+            # Digests for meetings indexed before digests existed or changed (or restored from a snapshot)
+            vector_db.ensure_digests()
+            
         return vector_db
         
     except Exception as e: